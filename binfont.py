@@ -0,0 +1,169 @@
+"""Lazily loaded bitmap fonts for the ILI9341 Display class.
+
+Glyphs stay on flash or SD and are read one at a time when drawn, so a
+large CJK font costs a few hundred bytes of RAM instead of the whole file.
+Use tools/bdf2font.py to build a font from a BDF file.
+
+File layout, all numbers are big-endian:
+
+    Offset      Size        Field
+    0           4           Magic b'BFNT'
+    4           2           Maximum glyph width W
+    6           2           Height H
+    8           4           Glyph count N
+    12          4 * N       Codepoints, sorted ascending
+    12 + 4 * N  R * N       Glyph records, R = 1 + W * ((H + 7) // 8)
+
+A glyph record is its width in pixels followed by the bitmap stored column
+by column, (H + 7) // 8 bytes per column with the top pixel in the least
+significant bit (the same layout as XglcdFont).  Records are padded to R
+bytes so the record of the i-th codepoint is at a fixed offset.
+"""
+from micropython import const
+
+HEADER_SIZE = const(12)
+
+
+class BinFont(object):
+    """Bitmap font read on demand from a BFNT file.
+
+    Opening a font only reads the 12 byte header.  Letters are found by a
+    binary search over the codepoint index on file and their record is read
+    into a reusable buffer.  Drop-in replacement for XglcdFont in
+    Display.draw_letter() and draw_text().
+
+    Example:
+        font = BinFont('fonts/wqy16.bfnt')
+        display.draw_text(0, 0, 'Hello 你好', font, color565(255, 255, 255))
+    """
+
+    def __init__(self, path, width_cache_size=128):
+        """Open font file.
+
+        Args:
+            path (string): BFNT font file.
+            width_cache_size (int): Letters whose record location and width
+                are remembered (default: 128).
+        """
+        self._file = open(path, 'rb')
+        header = self._file.read(HEADER_SIZE)
+        if len(header) != HEADER_SIZE or header[:4] != b'BFNT':
+            self._file.close()
+            raise ValueError('{0} is not a BFNT font.'.format(path))
+        self.width = int.from_bytes(header[4:6], 'big')
+        self.height = int.from_bytes(header[6:8], 'big')
+        self.letter_count = int.from_bytes(header[8:12], 'big')
+        self._column_bytes = (self.height + 7) // 8
+        self._record_size = 1 + self.width * self._column_bytes
+        self._records = HEADER_SIZE + 4 * self.letter_count
+        self._record = bytearray(self._record_size)
+        self._key = bytearray(4)
+        self._cache_size = width_cache_size
+        # Codepoint: (record offset, width) or None when missing
+        self._lookups = {}
+        self.reads = 0
+
+    def close(self):
+        """Close the font file."""
+        self._file.close()
+
+    def _find(self, code):
+        """Locate a codepoint.
+
+        Args:
+            code (int): Codepoint.
+        Returns:
+            tuple: (record offset, width) or None if the font lacks it.
+        """
+        found = self._lookups.get(code, False)
+        if found is not False:
+            return found
+        f = self._file
+        key = self._key
+        lo = 0
+        hi = self.letter_count - 1
+        found = None
+        while lo <= hi:
+            mid = (lo + hi) >> 1
+            f.seek(HEADER_SIZE + 4 * mid)
+            f.readinto(key)
+            self.reads += 1
+            value = int.from_bytes(key, 'big')
+            if value < code:
+                lo = mid + 1
+            elif value > code:
+                hi = mid - 1
+            else:
+                offset = self._records + mid * self._record_size
+                f.seek(offset)
+                found = (offset, f.read(1)[0])
+                self.reads += 1
+                break
+        if len(self._lookups) >= self._cache_size:
+            self._lookups = {}
+        self._lookups[code] = found
+        return found
+
+    def __contains__(self, letter):
+        return self._find(ord(letter)) is not None
+
+    def get_letter(self, letter, color, background=0, landscape=False):
+        """Convert letter to RGB565 bytes.
+
+        Args:
+            letter (string): Letter to return (must exist within font).
+            color (int): RGB565 color value.
+            background (int): RGB565 background color (default: black).
+            landscape (bool): Orientation (default: False = portrait)
+        Returns:
+            (bytearray): Pixel data.
+            (int, int): Letter width and height.
+        """
+        found = self._find(ord(letter))
+        if found is None:
+            print('Font does not contain character: ' + letter)
+            return b'', 0, 0
+        offset, w = found
+        h = self.height
+        f = self._file
+        f.seek(offset)
+        f.readinto(self._record)
+        self.reads += 1
+        mv = memoryview(self._record)
+        n = w * h
+        if background:
+            buf = bytearray(background.to_bytes(2, 'big') * n)
+        else:
+            buf = bytearray(n * 2)
+        hi = color >> 8
+        lo = color & 0xFF
+        cb = self._column_bytes
+        for x in range(w):
+            column = 1 + x * cb
+            for y in range(h):
+                if mv[column + (y >> 3)] & (1 << (y & 7)):
+                    if landscape:
+                        # Rotated 90 degrees so text reads bottom to top
+                        pos = ((w - 1 - x) * h + y) * 2
+                    else:
+                        pos = (y * w + x) * 2
+                    buf[pos] = hi
+                    buf[pos + 1] = lo
+        return buf, w, h
+
+    def measure_text(self, text, spacing=1):
+        """Measure length of text string in pixels.
+
+        Args:
+            text (string): Text string to measure
+            spacing (optional int): Pixel spacing between letters
+        Returns:
+            int: length of text
+        """
+        length = 0
+        for letter in text:
+            found = self._find(ord(letter))
+            # Missing letters take no space
+            if found is not None:
+                length += found[1] + spacing
+        return length
@@ -1,10 +1,31 @@
 """ILI9341 LCD/Touch module."""
+from array import array
 from time import sleep
-from math import cos, sin, pi, radians
+from math import cos, sin, pi, radians, floor, sqrt
 from sys import implementation
-import ustruct
 from micropython import const
 from machine import SoftI2C
+try:
+    import _thread
+except ImportError:
+    _thread = None
+try:
+    import uasyncio as asyncio
+except ImportError:
+    try:
+        import asyncio
+    except ImportError:
+        asyncio = None
+try:
+    from time import ticks_ms, ticks_diff
+except ImportError:
+    from time import monotonic
+
+    def ticks_ms():
+        return int(monotonic() * 1000)
+
+    def ticks_diff(a, b):
+        return a - b
 
 def color565(r, g, b):
     """Return RGB565 color value.
@@ -17,6 +38,568 @@ def color565(r, g, b):
     return (r & 0xf8) << 8 | (g & 0xfc) << 3 | b >> 3
 
 
+def span_blocks(rows):
+    """Merge horizontal row spans into rectangular blocks.
+
+    Args:
+        rows (iterable): (y, x0, x1) spans in increasing row order, x0 and
+            x1 inclusive.
+    Returns:
+        array: (x, y, w, h) blocks.  A span covering the same columns as a
+            span on the row above extends that block instead.
+    """
+    blocks = array('h')
+    tails = {}
+    for y, x0, x1 in rows:
+        w = x1 - x0 + 1
+        i = tails.get((x0, w))
+        if i is not None and blocks[i + 1] + blocks[i + 3] == y:
+            blocks[i + 3] += 1
+        else:
+            tails[(x0, w)] = len(blocks)
+            blocks.append(x0)
+            blocks.append(y)
+            blocks.append(w)
+            blocks.append(1)
+    return blocks
+
+
+def column_spans(columns, h):
+    """Convert centered vertical columns into blocks of row spans.
+
+    Args:
+        columns (iterable): (x, y) pairs, each a column from -y to +y
+            mirrored at -x and +x.
+        h (int): Largest y value of any column.
+    Returns:
+        array: (x, y, w, h) blocks relative to the center.
+    """
+    widest = [-1] * (h + 1)
+    for x, y in columns:
+        if x > widest[y]:
+            widest[y] = x
+    # A row is as wide as the widest column reaching it
+    half = -1
+    for y in range(h, -1, -1):
+        if widest[y] > half:
+            half = widest[y]
+        widest[y] = half
+    return span_blocks([(dy, -widest[abs(dy)], widest[abs(dy)])
+                        for dy in range(-h, h + 1)])
+
+
+def circle_points(r):
+    """Trace a quarter circle outline (midpoint algorithm).
+
+    Args:
+        r (int): Radius.
+    Returns:
+        list: (x, y) points from (0, r) to (r, 0), each a step from the
+            one before.
+    """
+    f = 1 - r
+    dx = 1
+    dy = -r - r
+    x = 0
+    y = r
+    octant = [(0, r)]
+    while x < y:
+        if f >= 0:
+            y -= 1
+            dy += 2
+            f += dy
+        x += 1
+        dx += 2
+        f += dx
+        octant.append((x, y))
+    # Mirror the octant about the diagonal to complete the quadrant
+    points = list(octant)
+    for i in range(len(octant) - 1, -1, -1):
+        x, y = octant[i]
+        if (y, x) != points[-1]:
+            points.append((y, x))
+    return points
+
+
+def circle_spans(r):
+    """Rasterize a filled circle (midpoint algorithm).
+
+    Args:
+        r (int): Radius.
+    Returns:
+        array: (x, y, w, h) blocks relative to the center.
+    """
+    return column_spans(circle_points(r), r)
+
+
+def ellipse_points(a, b):
+    """Trace a quarter ellipse outline (midpoint algorithm).
+
+    Args:
+        a (int): Semi axis horizontal.
+        b (int): Semi axis vertical.
+    Returns:
+        list: (x, y) points from (0, b) to (a, 0), each a step from the
+            one before.
+    """
+    a2 = a * a
+    b2 = b * b
+    twoa2 = a2 + a2
+    twob2 = b2 + b2
+    x = 0
+    y = b
+    px = 0
+    py = twoa2 * y
+    points = [(0, b)]
+    # Region 1
+    p = round(b2 - (a2 * b) + (0.25 * a2))
+    while px < py:
+        x += 1
+        px += twob2
+        if p < 0:
+            p += b2 + px
+        else:
+            y -= 1
+            py -= twoa2
+            p += b2 + px - py
+        points.append((x, y))
+    # Region 2
+    p = round(b2 * (x + 0.5) * (x + 0.5) +
+              a2 * (y - 1) * (y - 1) - a2 * b2)
+    while y > 0:
+        y -= 1
+        py -= twoa2
+        if p > 0:
+            p += a2 - py
+        else:
+            x += 1
+            px += twob2
+            p += a2 - py + px
+        points.append((x, y))
+    return points
+
+
+def ellipse_spans(a, b):
+    """Rasterize a filled ellipse (midpoint algorithm).
+
+    Args:
+        a (int): Semi axis horizontal.
+        b (int): Semi axis vertical.
+    Returns:
+        array: (x, y, w, h) blocks relative to the center.
+    """
+    return column_spans(ellipse_points(a, b), b)
+
+
+def outline_spans(points):
+    """Turn a traced quarter outline into blocks for all four quarters.
+
+    Consecutive points on the same row or column become one run, so a
+    circle outline is a few dozen lines rather than hundreds of pixels.
+
+    Args:
+        points (list): (x, y) points from outline tracing, x ascending and
+            y descending.
+    Returns:
+        array: (x, y, w, h) blocks relative to the center.
+    """
+    blocks = array('h')
+
+    def emit(xa, xb, ya, yb):
+        # Runs starting on an axis join with their mirror image
+        if xa == 0:
+            xs = ((-xb, xb),)
+        else:
+            xs = ((xa, xb), (-xb, -xa))
+        if ya == 0:
+            ys = ((-yb, yb),)
+        else:
+            ys = ((ya, yb), (-yb, -ya))
+        for x0, x1 in xs:
+            for y0, y1 in ys:
+                blocks.append(x0)
+                blocks.append(y0)
+                blocks.append(x1 - x0 + 1)
+                blocks.append(y1 - y0 + 1)
+
+    xa, ya = points[0]
+    xb, yb = xa, ya
+    for x, y in points[1:]:
+        if y == ya and yb == ya:
+            xb = x
+        elif x == xa and xb == xa:
+            ya = y
+        else:
+            emit(xa, xb, ya, yb)
+            xa, ya = x, y
+            xb, yb = x, y
+    emit(xa, xb, ya, yb)
+    return blocks
+
+
+def circle_outline_spans(r):
+    """Rasterize a circle outline into row and column runs.
+
+    Args:
+        r (int): Radius.
+    Returns:
+        array: (x, y, w, h) blocks relative to the center.
+    """
+    return outline_spans(circle_points(r))
+
+
+def ellipse_outline_spans(a, b):
+    """Rasterize an ellipse outline into row and column runs.
+
+    Args:
+        a (int): Semi axis horizontal.
+        b (int): Semi axis vertical.
+    Returns:
+        array: (x, y, w, h) blocks relative to the center.
+    """
+    return outline_spans(ellipse_points(a, b))
+
+
+def polygon_spans(sides, r, rotate=0):
+    """Rasterize a filled n-sided regular polygon.
+
+    Args:
+        sides (int): Number of polygon sides.
+        r (int): Radius.
+        rotate (Optional float): Rotation in degrees relative to origin.
+    Returns:
+        array: (x, y, w, h) blocks relative to the center.
+    """
+    coords = []
+    theta = radians(rotate)
+    for s in range(sides):
+        t = 2.0 * pi * s / sides + theta
+        coords.append((floor(r * cos(t)), floor(r * sin(t))))
+    return scanline_spans(coords)
+
+
+def scanline_spans(coords):
+    """Rasterize any polygon with an edge table scanline fill.
+
+    Args:
+        coords ([[int, int],...]): Vertex X, Y pairs.  Convex and concave
+            outlines are filled with the even-odd rule and the closing
+            edge back to the first vertex is implied.
+    Returns:
+        array: (x, y, w, h) blocks.
+    """
+    return span_blocks(scanline_rows(coords))
+
+
+def scanline_rows(coords):
+    """Rasterize any polygon into row spans, see scanline_spans().
+
+    Args:
+        coords ([[int, int],...]): Vertex X, Y pairs.
+    Returns:
+        list: (y, x0, x1) spans in increasing row order.
+    """
+    edges = []
+    flats = {}
+    ymin = ymax = coords[0][1]
+    x1, y1 = coords[-1]
+    for x2, y2 in coords:
+        if y2 < ymin:
+            ymin = y2
+        elif y2 > ymax:
+            ymax = y2
+        if y1 == y2:
+            # Horizontal edges are filled as spans on their own row
+            flats.setdefault(y1, []).append((min(x1, x2), max(x1, x2)))
+        elif y1 < y2:
+            edges.append((y1, y2, x1, (x2 - x1) / (y2 - y1)))
+        else:
+            edges.append((y2, y1, x2, (x1 - x2) / (y1 - y2)))
+        x1, y1 = x2, y2
+    edges.sort(key=lambda e: e[0])
+    active = []
+    rows = []
+    k = 0
+    for y in range(ymin, ymax + 1):
+        while k < len(edges) and edges[k][0] == y:
+            active.append(edges[k])
+            k += 1
+        # Edges cover [top, bottom) except on the last row
+        xs = sorted(e[2] + (y - e[0]) * e[3] for e in active
+                    if e[1] > y or y == ymax)
+        spans = flats.get(y, [])
+        for i in range(0, len(xs) - 1, 2):
+            spans.append((floor(xs[i] + 0.5), floor(xs[i + 1] + 0.5)))
+        if len(spans) > 1:
+            spans.sort()
+        x0 = x1 = None
+        for a, b in spans:
+            if x0 is None:
+                x0, x1 = a, b
+            elif a <= x1 + 1:
+                if b > x1:
+                    x1 = b
+            else:
+                rows.append((y, x0, x1))
+                x0, x1 = a, b
+        if x0 is not None:
+            rows.append((y, x0, x1))
+        active = [e for e in active if e[1] > y]
+    return rows
+
+
+def union_rows(rows):
+    """Merge overlapping row spans from several shapes.
+
+    Args:
+        rows (iterable): (y, x0, x1) spans in any order.
+    Returns:
+        list: Disjoint (y, x0, x1) spans in increasing row order.
+    """
+    merged = []
+    x0 = x1 = y0 = None
+    for y, a, b in sorted(rows):
+        if y == y0 and a <= x1 + 1:
+            if b > x1:
+                x1 = b
+            continue
+        if y0 is not None:
+            merged.append((y0, x0, x1))
+        y0, x0, x1 = y, a, b
+    if y0 is not None:
+        merged.append((y0, x0, x1))
+    return merged
+
+
+def disk_rows(cx, cy, radius):
+    """Return the row spans of the pixels whose centers lie in a circle.
+
+    Args:
+        cx, cy (int): Center.
+        radius (float): Radius.
+    Returns:
+        list: (y, x0, x1) spans.
+    """
+    rows = []
+    r2 = radius * radius
+    reach = int(radius)
+    for dy in range(-reach, reach + 1):
+        v = r2 - dy * dy
+        if v > 0:
+            half = sqrt(v)
+            # Strictly inside, so a center exactly on the edge is left out
+            x = int(half) if half != int(half) else int(half) - 1
+            rows.append((cy + dy, cx - x, cx + x))
+    return rows
+
+
+def arc_spans(r, inner, start, end):
+    """Rasterize a ring segment or pie slice.
+
+    Args:
+        r (int): Outer radius.
+        inner (int): Radius of the hole, negative for a pie slice.
+        start (float): Start angle in degrees, 0 points along +x and
+            angles increase clockwise on screen.
+        end (float): End angle in degrees.  An end before the start
+            wraps past 0 (300 to 30 is a 90 degree arc), a sweep of 360
+            or more draws the whole ring and equal angles draw nothing.
+    Returns:
+        array: (x, y, w, h) blocks relative to the center.
+    """
+    sweep = end - start
+    if sweep == 0:
+        return array('h')
+    full = sweep >= 360
+    while end <= start:
+        end += 360
+    sweep = end - start
+    sx = cos(radians(start))
+    sy = sin(radians(start))
+    ex = cos(radians(end))
+    ey = sin(radians(end))
+    wide = sweep % 360 > 180
+    rows = []
+    outer2 = r * r + r
+    inner2 = inner * inner + inner if inner >= 0 else -1
+    for dy in range(-r, r + 1):
+        xo = int(sqrt(outer2 - dy * dy))
+        if inner2 - dy * dy >= 0:
+            xi = int(sqrt(inner2 - dy * dy))
+            segments = ((-xo, -xi - 1), (xi + 1, xo))
+        else:
+            segments = ((-xo, xo),)
+        for a, b in segments:
+            if full:
+                rows.append((dy, a, b))
+                continue
+            run = None
+            for dx in range(a, b + 1):
+                # Cross products give the side of each sector edge
+                after_start = sx * dy - sy * dx >= 0
+                before_end = dx * ey - dy * ex >= 0
+                if wide:
+                    inside = after_start or before_end
+                else:
+                    inside = after_start and before_end
+                if inside:
+                    if run is None:
+                        run = dx
+                elif run is not None:
+                    rows.append((dy, run, dx - 1))
+                    run = None
+            if run is not None:
+                rows.append((dy, run, b))
+    return span_blocks(rows)
+
+
+def round_rect_spans(w, h, r):
+    """Rasterize a filled rectangle with rounded corners.
+
+    Args:
+        w (int): Width.
+        h (int): Height.
+        r (int): Corner radius, limited to half the shorter side.
+    Returns:
+        array: (x, y, w, h) blocks relative to the top left corner.
+    """
+    r = max(0, min(r, w // 2, h // 2))
+    rows = []
+    for i in range(r):
+        yy = r - i - 0.5
+        inset = int(r - sqrt(r * r - yy * yy) + 0.5)
+        rows.append((i, inset, w - 1 - inset))
+    for i in range(r, h - r):
+        rows.append((i, 0, w - 1))
+    for i in range(r - 1, -1, -1):
+        rows.append((h - 1 - i, rows[i][1], rows[i][2]))
+    return span_blocks(rows)
+
+
+def thick_line_spans(dx, dy, width, rounded):
+    """Rasterize a wide line from the origin to dx, dy.
+
+    A pixel is drawn when its center lies in the band of the given width
+    around the line, between the perpendiculars through both end points.
+
+    Args:
+        dx, dy (int): End point relative to the start point.
+        width (int): Line width in pixels.
+        rounded (bool): Add round caps at both ends.
+    Returns:
+        array: (x, y, w, h) blocks relative to the start point.
+    """
+    half = width / 2
+    length = sqrt(dx * dx + dy * dy)
+    rows = []
+    if length:
+        ux = dx / length
+        uy = dy / length
+        reach = int(half) + 1
+        for y in range(min(0, dy) - reach, max(0, dy) + reach + 1):
+            lo = -1e9
+            hi = 1e9
+            # Along the line: 0 <= x * ux + y * uy <= length
+            # Across the line: -half <= x * uy - y * ux < half
+            for k, a, b in ((ux, -y * uy, length - y * uy),
+                            (uy, y * ux - half, y * ux + half - 1e-6)):
+                if k > 1e-9 or k < -1e-9:
+                    a /= k
+                    b /= k
+                    if k < 0:
+                        a, b = b, a
+                    if a > lo:
+                        lo = a
+                    if b < hi:
+                        hi = b
+                elif a > 0 or b < 0:
+                    lo = hi + 1
+            x0 = int(-floor(-lo))
+            x1 = int(floor(hi))
+            if x0 <= x1:
+                rows.append((y, x0, x1))
+    if rounded or not length:
+        rows.extend(disk_rows(0, 0, half))
+        rows.extend(disk_rows(dx, dy, half))
+        rows = union_rows(rows)
+    return span_blocks(rows)
+
+
+class LRUCache(object):
+    """Least recently used cache with a byte budget.
+
+    Sizes are supplied by the caller, so the budget covers whatever the
+    caller counts (e.g. span array or pixel buffer bytes).
+    """
+
+    def __init__(self, budget):
+        """Initialize cache.
+
+        Args:
+            budget (int): Maximum total size of cached values in bytes.
+        """
+        self.budget = budget
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = {}
+        self._tick = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def clear(self):
+        """Remove all cached values (statistics are kept)."""
+        self._items = {}
+        self.used = 0
+
+    def get(self, key):
+        """Return the cached value for key or None.
+
+        Args:
+            key (hashable): Cache key.
+        """
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._tick += 1
+        item[2] = self._tick
+        return item[0]
+
+    def hit_rate(self):
+        """Return the fraction of lookups that were hits."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def put(self, key, value, size):
+        """Store a value, evicting least recently used values to fit.
+
+        Args:
+            key (hashable): Cache key.
+            value (object): Value to cache.
+            size (int): Size of the value in bytes.
+        """
+        if size > self.budget:
+            return
+        items = self._items
+        old = items.pop(key, None)
+        if old is not None:
+            self.used -= old[1]
+        while self.used + size > self.budget:
+            oldest = None
+            for k, item in items.items():
+                if oldest is None or item[2] < items[oldest][2]:
+                    oldest = k
+            self.used -= items.pop(oldest)[1]
+            self.evictions += 1
+        self._tick += 1
+        items[key] = [value, size, self._tick]
+        self.used += size
+
+
 class Display(object):
     """Serial interface for 16-bit color (5-6-5 RGB) IL9341 display.
 
@@ -51,6 +634,7 @@ class Display(object):
     MADCTL = const(0x36)  # Memory access control
     VSCRSADD = const(0x37)  # Vertical scrolling start address
     PIXFMT = const(0x3A)  # COLMOD: Pixel format set
+    WRITE_RAM_CONT = const(0x3C)  # Memory write continue
     WRITE_DISPLAY_BRIGHTNESS = const(0x51)  # Brightness hardware dependent!
     READ_DISPLAY_BRIGHTNESS = const(0x52)
     WRITE_CTRL_DISPLAY = const(0x53)
@@ -89,8 +673,47 @@ class Display(object):
         270: 0x28
     }
 
+    # Dirty rectangles kept before collapsing into one bounding box
+    MAX_DIRTY = const(8)
+    # Longest parameter list sent from the preallocated argument buffer
+    MAX_ARGS = const(16)
+    # Solid color fill buffers, allocated once and refilled in place
+    FILL_PATTERNS = const(2)
+    # Datasheet minimum delays in ms: reset release to the first command,
+    # reset to SLPOUT and SLPOUT to the next command
+    RESET_DELAY = const(5)
+    SLPOUT_DELAY = const(120)
+    WAKE_DELAY = const(5)
+
+    # Panel setup as command, parameter count, parameters (see init_panel)
+    INIT_TABLE = bytes((
+        PWCTRB, 3, 0x00, 0xC1, 0x30,  # Pwr ctrl B
+        POSC, 4, 0x64, 0x03, 0x12, 0x81,  # Pwr on seq. ctrl
+        DTCA, 3, 0x85, 0x00, 0x78,  # Driver timing ctrl A
+        PWCTRA, 5, 0x39, 0x2C, 0x00, 0x34, 0x02,  # Pwr ctrl A
+        PUMPRC, 1, 0x20,  # Pump ratio control
+        DTCB, 2, 0x00, 0x00,  # Driver timing ctrl B
+        PWCTR1, 1, 0x23,  # Pwr ctrl 1
+        PWCTR2, 1, 0x10,  # Pwr ctrl 2
+        VMCTR1, 2, 0x3E, 0x28,  # VCOM ctrl 1
+        VMCTR2, 1, 0x86,  # VCOM ctrl 2
+        VSCRSADD, 2, 0x00, 0x00,  # Vertical scrolling start address
+        PIXFMT, 1, 0x55,  # COLMOD: Pixel format
+        FRMCTR1, 2, 0x00, 0x18,  # Frame rate ctrl
+        DFUNCTR, 3, 0x08, 0x82, 0x27,  # Display function ctrl
+        ENABLE3G, 1, 0x00,  # Enable 3 gamma ctrl
+        GAMMASET, 1, 0x01,  # Gamma curve selected
+        GMCTRP1, 15, 0x0F, 0x31, 0x2B, 0x0C, 0x0E, 0x08, 0x4E, 0xF1, 0x37,
+        0x07, 0x10, 0x03, 0x0E, 0x09, 0x00,  # Positive gamma
+        GMCTRN1, 15, 0x00, 0x0E, 0x14, 0x03, 0x11, 0x07, 0x31, 0xC1, 0x48,
+        0x08, 0x0F, 0x0C, 0x31, 0x36, 0x0F,  # Negative gamma
+    ))
+
     def __init__(self, spi, cs, dc, rst,
-                 width=320, height=240, rotation=0):
+                 width=320, height=240, rotation=0, buffered=False,
+                 span_cache_size=4096, chunk_size=8192,
+                 glyph_cache_size=4096, slice_ms=5, wdt=None,
+                 warm_start=False, bus_lock=None):
         """Initialize OLED.
 
         Args:
@@ -101,6 +724,32 @@ class Display(object):
             width (Optional int): Screen width (default 240)
             height (Optional int): Screen height (default 320)
             rotation (Optional int): Rotation must be 0 default, 90. 180 or 270
+            buffered (Optional bool): Draw into an RGB565 shadow buffer and
+                only update the panel on flush() (default False)
+            span_cache_size (Optional int): Bytes of rasterized shape spans
+                kept for repeated fill_circle/fill_ellipse/fill_polygon
+                calls (default 4096, 0 disables the cache)
+            chunk_size (Optional int): Largest single SPI data transfer in
+                bytes, used for fills, images and flushes (default 8192).
+                Raise it on PSRAM boards, lower it to save RAM.
+            glyph_cache_size (Optional int): Bytes of rendered letters kept
+                for draw_letter/draw_text (default 4096, 0 disables)
+            slice_ms (Optional int): Longest time the *_async methods draw
+                before yielding to other tasks (default 5)
+            wdt (Optional WDT): Watchdog fed each time an *_async method
+                yields (default None)
+            warm_start (Optional bool): Skip the reset and setup when the
+                panel already runs with this rotation and pixel format,
+                e.g. after a soft reset.  Needs MISO (default False)
+            bus_lock (Optional lock): _thread lock shared with the other
+                users of this SPI bus, such as the SD card on the same
+                SCK/MOSI/MISO pins.  draw_image(threaded=True) holds it
+                for every file read and every panel write (default None:
+                image files are not on this bus)
+        Note:
+            The shadow buffer needs width x height x 2 bytes of RAM.  On
+            ESP32 boards with PSRAM the MicroPython heap lives in PSRAM,
+            so the buffer is allocated there automatically.
         """
         self.spi = spi
         self.cs = cs
@@ -108,6 +757,38 @@ class Display(object):
         self.rst = rst
         self.width = width
         self.height = height
+        self._fb = None
+        self._dirty = []
+        self.span_cache = LRUCache(span_cache_size)
+        self.glyph_cache = LRUCache(glyph_cache_size)
+        self.chunk_size = max(chunk_size & ~1, width * 2)
+        # Fill pattern buffers, their colors and filled lengths, most
+        # recently used first
+        self._fill_bufs = [None] * self.FILL_PATTERNS
+        self._fill_colors = [None] * self.FILL_PATTERNS
+        self._fill_lens = [0] * self.FILL_PATTERNS
+        self._xfer_bufs = [None, None]
+        # Preallocated transfer buffers so steady-state drawing never
+        # allocates: command byte, address window, parameters and pixel
+        self._cmd_buf = bytearray(1)
+        self._win_buf = bytearray(4)
+        self._px_buf = bytearray(2)
+        self._arg_buf = bytearray(self.MAX_ARGS)
+        arg_mv = memoryview(self._arg_buf)
+        self._arg_views = [arg_mv[:n] for n in range(self.MAX_ARGS + 1)]
+        # Number of address commands skipped by the window cache
+        self.elided_cmds = 0
+        # Primitives trimmed to the screen / dropped as fully off screen
+        self.clipped = 0
+        self.rejected = 0
+        self.slice_ms = slice_ms
+        self.wdt = wdt
+        self.bus_lock = bus_lock
+        self._slice_start = ticks_ms()
+        # Nesting level of session() blocks and the writers they replace
+        self._session_depth = 0
+        self._session_saved = None
+        self.invalidate_window()
         if rotation not in self.ROTATE.keys():
             raise RuntimeError('Rotation must be 0, 90, 180 or 270.')
         else:
@@ -121,6 +802,7 @@ class Display(object):
             self.reset = self.reset_cpy
             self.write_cmd = self.write_cmd_cpy
             self.write_data = self.write_data_cpy
+            self.read_data = self.read_data_cpy
         else:
             self.cs.init(self.cs.OUT, value=1)
             self.dc.init(self.dc.OUT, value=0)
@@ -128,36 +810,47 @@ class Display(object):
             self.reset = self.reset_mpy
             self.write_cmd = self.write_cmd_mpy
             self.write_data = self.write_data_mpy
-        self.reset()
-        # Send initialization commands
-        self.write_cmd(self.SWRESET)  # Software reset
-        sleep(.1)
-        self.write_cmd(self.PWCTRB, 0x00, 0xC1, 0x30)  # Pwr ctrl B
-        self.write_cmd(self.POSC, 0x64, 0x03, 0x12, 0x81)  # Pwr on seq. ctrl
-        self.write_cmd(self.DTCA, 0x85, 0x00, 0x78)  # Driver timing ctrl A
-        self.write_cmd(self.PWCTRA, 0x39, 0x2C, 0x00, 0x34, 0x02)  # Pwr ctrl A
-        self.write_cmd(self.PUMPRC, 0x20)  # Pump ratio control
-        self.write_cmd(self.DTCB, 0x00, 0x00)  # Driver timing ctrl B
-        self.write_cmd(self.PWCTR1, 0x23)  # Pwr ctrl 1
-        self.write_cmd(self.PWCTR2, 0x10)  # Pwr ctrl 2
-        self.write_cmd(self.VMCTR1, 0x3E, 0x28)  # VCOM ctrl 1
-        self.write_cmd(self.VMCTR2, 0x86)  # VCOM ctrl 2
-        self.write_cmd(self.MADCTL, self.rotation)  # Memory access ctrl
-        self.write_cmd(self.VSCRSADD, 0x00)  # Vertical scrolling start address
-        self.write_cmd(self.PIXFMT, 0x55)  # COLMOD: Pixel format
-        self.write_cmd(self.FRMCTR1, 0x00, 0x18)  # Frame rate ctrl
-        self.write_cmd(self.DFUNCTR, 0x08, 0x82, 0x27)
-        self.write_cmd(self.ENABLE3G, 0x00)  # Enable 3 gamma ctrl
-        self.write_cmd(self.GAMMASET, 0x01)  # Gamma curve selected
-        self.write_cmd(self.GMCTRP1, 0x0F, 0x31, 0x2B, 0x0C, 0x0E, 0x08, 0x4E,
-                       0xF1, 0x37, 0x07, 0x10, 0x03, 0x0E, 0x09, 0x00)
-        self.write_cmd(self.GMCTRN1, 0x00, 0x0E, 0x14, 0x03, 0x11, 0x07, 0x31,
-                       0xC1, 0x48, 0x08, 0x0F, 0x0C, 0x31, 0x36, 0x0F)
-        self.write_cmd(self.SLPOUT)  # Exit sleep
-        sleep(.1)
-        self.write_cmd(self.DISPLAY_ON)  # Display on
-        sleep(.1)
-        self.clear()
+            self.read_data = self.read_data_mpy
+        if warm_start and self._panel_ready():
+            # Whole screen scrolls, no offset
+            with self:
+                self.set_scroll(0, 0)
+                self.scroll(0)
+            self.clear()
+        else:
+            self.init_panel()
+        if buffered:
+            # Panel was just cleared to black, which matches a zeroed buffer
+            self._fb = bytearray(width * height * 2)
+            self._fb_mv = memoryview(self._fb)
+
+    def __enter__(self):
+        if self._session_depth == 0:
+            self._session_saved = (self.write_cmd, self.write_data)
+            if implementation.name == 'circuitpython':
+                while not self.spi.try_lock():
+                    pass
+                self.cs.value = False
+                self.write_cmd = self.write_cmd_cpy_held
+                self.write_data = self.write_data_cpy_held
+            else:
+                self.cs(0)
+                self.write_cmd = self.write_cmd_mpy_held
+                self.write_data = self.write_data_mpy_held
+        self._session_depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._session_depth -= 1
+        if self._session_depth == 0:
+            self.write_cmd, self.write_data = self._session_saved
+            self._session_saved = None
+            if implementation.name == 'circuitpython':
+                self.cs.value = True
+                self.spi.unlock()
+            else:
+                self.cs(1)
+        return False
 
     def block(self, x0, y0, x1, y1, data):
         """Write a block of data to display.
@@ -168,12 +861,178 @@ class Display(object):
             x1 (int):  Ending X position.
             y1 (int):  Ending Y position.
             data (bytes): Data buffer to write.
+        Note:
+            In buffered mode the data goes to the shadow buffer and the
+            region is marked dirty until the next flush().
         """
-        self.write_cmd(self.SET_COLUMN, *ustruct.pack(">HH", x0, x1))
-        self.write_cmd(self.SET_PAGE, *ustruct.pack(">HH", y0, y1))
+        if self._fb is not None:
+            self._fb_block(x0, y0, x1, y1, data)
+            return
+        self._write_block(x0, y0, x1, y1, data)
 
-        self.write_cmd(self.WRITE_RAM)
+    def _write_block(self, x0, y0, x1, y1, data):
+        """Write a block of data straight to the panel.
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            y1 (int):  Ending Y position.
+            data (bytes): Data buffer to write.
+        """
+        self._begin_write(x0, y0, x1)
         self.write_data(data)
+        self._end_write(x0, y0, x1, len(data))
+
+    def _begin_write(self, x0, y0, x1):
+        """Address the panel RAM and start a memory write.
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+        Note:
+            The page window is left open to the bottom of the screen so
+            the RAM pointer keeps auto-incrementing past the block.  A
+            block that starts exactly where the previous one stopped, with
+            the same columns, is sent with WRITE_RAM_CONT and no
+            addressing at all.
+        """
+        if x0 == self._col0 and x1 == self._col1 and y0 == self._next_y:
+            self.write_cmd(self.WRITE_RAM_CONT)
+            self.elided_cmds += 2
+            return
+        if x0 != self._col0 or x1 != self._col1:
+            self._write_window(self.SET_COLUMN, x0, x1)
+            self._col0 = x0
+            self._col1 = x1
+        else:
+            self.elided_cmds += 1
+        if y0 != self._page0:
+            self._write_window(self.SET_PAGE, y0, self.height - 1)
+            self._page0 = y0
+        else:
+            self.elided_cmds += 1
+        self.write_cmd(self.WRITE_RAM)
+
+    def _end_write(self, x0, y0, x1, size):
+        """Record where the RAM pointer stopped after a memory write.
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            size (int): Bytes written.
+        """
+        rows, partial = divmod(size, (x1 - x0 + 1) * 2)
+        if partial or y0 + rows >= self.height:
+            self._next_y = -1
+        else:
+            self._next_y = y0 + rows
+
+    def invalidate_window(self):
+        """Forget the cached address window.
+
+        Note:
+            Call this after sending SET_COLUMN, SET_PAGE or MADCTL with
+            write_cmd() directly so the next block() re-addresses the panel.
+        """
+        self._col0 = -1
+        self._col1 = -1
+        self._page0 = -1
+        self._next_y = -1
+
+    def _write_window(self, command, start, end):
+        """Send a column or page address command without allocating.
+
+        Args:
+            command (byte): SET_COLUMN or SET_PAGE.
+            start (int): First address of the window.
+            end (int): Last address of the window.
+        """
+        buf = self._win_buf
+        buf[0] = start >> 8
+        buf[1] = start & 0xFF
+        buf[2] = end >> 8
+        buf[3] = end & 0xFF
+        self.write_cmd(command)
+        self.write_data(buf)
+
+    def _pack_args(self, args):
+        """Copy command parameters into the preallocated argument buffer.
+
+        Args:
+            args (tuple): Parameter bytes.
+        Returns:
+            memoryview: Parameters ready to transmit.
+        """
+        n = len(args)
+        if n > self.MAX_ARGS:
+            return bytearray(args)
+        buf = self._arg_buf
+        for i in range(n):
+            buf[i] = args[i]
+        return self._arg_views[n]
+
+    def _fb_block(self, x0, y0, x1, y1, data):
+        """Copy a block of data into the shadow buffer.
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            y1 (int):  Ending Y position.
+            data (bytes): Data buffer to write.
+        """
+        if x0 < 0 or y0 < 0 or x1 >= self.width or y1 >= self.height:
+            return
+        fb = self._fb_mv
+        src = memoryview(data)
+        size = min(len(data), (x1 - x0 + 1) * (y1 - y0 + 1) * 2)
+        stride = self.width * 2
+        offset = (y0 * self.width + x0) * 2
+        row = (x1 - x0 + 1) * 2
+        if row == stride:
+            # Full width rows are contiguous in the buffer
+            fb[offset:offset + size] = src[:size]
+        else:
+            i = 0
+            while i < size:
+                n = min(row, size - i)
+                fb[offset:offset + n] = src[i:i + n]
+                i += row
+                offset += stride
+        self._mark_dirty(x0, y0, x1, y1)
+
+    def _mark_dirty(self, x0, y0, x1, y1):
+        """Add a rectangle to the dirty list, merging touching rectangles.
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            y1 (int):  Ending Y position.
+        """
+        dirty = self._dirty
+        for r in dirty:
+            if (x0 <= r[2] + 1 and x1 >= r[0] - 1 and
+                    y0 <= r[3] + 1 and y1 >= r[1] - 1):
+                if x0 < r[0]:
+                    r[0] = x0
+                if y0 < r[1]:
+                    r[1] = y0
+                if x1 > r[2]:
+                    r[2] = x1
+                if y1 > r[3]:
+                    r[3] = y1
+                return
+        dirty.append([x0, y0, x1, y1])
+        if len(dirty) > self.MAX_DIRTY:
+            # Too many regions, fall back to their bounding box
+            self._dirty = [[min(r[0] for r in dirty),
+                            min(r[1] for r in dirty),
+                            max(r[2] for r in dirty),
+                            max(r[3] for r in dirty)]]
 
     def cleanup(self):
         """Clean up resources."""
@@ -188,15 +1047,15 @@ class Display(object):
         Args:
             color (Optional int): RGB565 color value (Default: 0 = Black).
         """
-        w = self.width
-        h = self.height
-        # Clear display in 1024 byte blocks
-        if color:
-            line = color.to_bytes(2, 'big') * (w * 8)
-        else:
-            line = bytearray(w * 16)
-        for y in range(0, h, 8):
-            self.block(0, y, w - 1, y + 7, line)
+        self._fill_block(0, 0, self.width, self.height, color)
+
+    async def clear_async(self, color=0):
+        """Clear display, yielding to other tasks between chunks.
+
+        Args:
+            color (Optional int): RGB565 color value (Default: 0 = Black).
+        """
+        await self.fill_hrect_async(0, 0, self.width, self.height, color)
 
     def display_off(self):
         """Turn display off."""
@@ -206,6 +1065,270 @@ class Display(object):
         """Turn display on."""
         self.write_cmd(self.DISPLAY_ON)
 
+    def _fill_block(self, x, y, w, h, color):
+        """Fill an on-screen rectangle from a cached color pattern.
+
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of rectangle.
+            h (int): Height of rectangle.
+            color (int): RGB565 color value.
+        Note:
+            The panel window is set once and the pattern is streamed in
+            chunk_size pieces, so a full screen clear is a handful of
+            large writes.
+        """
+        size = w * h * 2
+        if self._fb is not None:
+            fb = self._fb_mv
+            stride = self.width * 2
+            row = w * 2
+            pattern = self._fill_pattern(color,
+                                         size if row == stride else row)
+            offset = (y * self.width + x) * 2
+            if row == stride:
+                # Full width rows are contiguous in the buffer
+                end = offset + size
+                while offset < end:
+                    n = min(len(pattern), end - offset)
+                    fb[offset:offset + n] = pattern[:n]
+                    offset += n
+            else:
+                for _ in range(h):
+                    i = 0
+                    while i < row:
+                        n = min(len(pattern), row - i)
+                        fb[offset + i:offset + i + n] = pattern[:n]
+                        i += n
+                    offset += stride
+            self._mark_dirty(x, y, x + w - 1, y + h - 1)
+            return
+        pattern = self._fill_pattern(color, size)
+        self._begin_write(x, y, x + w - 1)
+        sent = 0
+        chunk = len(pattern)
+        while sent < size:
+            n = min(chunk, size - sent)
+            self.write_data(pattern if n == chunk else pattern[:n])
+            sent += n
+        self._end_write(x, y, x + w - 1, size)
+
+    def _fill_pattern(self, color, size=None):
+        """Return a buffer starting with one color.
+
+        Args:
+            color (int): RGB565 color value.
+            size (Optional int): Bytes of the color needed (default:
+                chunk_size).
+        Returns:
+            memoryview: Fill pattern of at least min(size, chunk_size)
+                bytes, that many of them hold the color.
+        Note:
+            FILL_PATTERNS buffers are refilled in place when the color
+            changes, only as far as the fill needs, so switching between
+            many colors costs no allocation.  Each buffer starts at the
+            size of its first fill and at least doubles when a larger fill
+            needs it, up to chunk_size, so small fills keep little RAM.
+        """
+        chunk = self.chunk_size
+        need = chunk if size is None else min(size, chunk)
+        colors = self._fill_colors
+        last = self.FILL_PATTERNS - 1
+        slot = 0
+        while slot < last and colors[slot] != color:
+            slot += 1
+        pattern = self._fill_bufs[slot]
+        n = self._fill_lens[slot] if colors[slot] == color else 0
+        if pattern is None or len(pattern) < need:
+            length = need
+            if pattern is not None:
+                length = min(max(need, len(pattern) * 2), chunk)
+            grown = memoryview(bytearray(length))
+            if n:
+                grown[:n] = pattern[:n]
+            pattern = grown
+            self._fill_bufs[slot] = pattern
+        if not n:
+            # Reuse the least recently used buffer for the new color
+            colors[slot] = color
+            pattern[0] = color >> 8
+            pattern[1] = color & 0xFF
+            n = 2
+        # Double the filled part until the fill is covered
+        while n < need:
+            m = min(n, need - n)
+            pattern[n:n + m] = pattern[:m]
+            n += m
+        self._fill_lens[slot] = n
+        if slot:
+            # Move to the front so it is the last one evicted
+            bufs = self._fill_bufs
+            lens = self._fill_lens
+            while slot:
+                colors[slot] = colors[slot - 1]
+                bufs[slot] = bufs[slot - 1]
+                lens[slot] = lens[slot - 1]
+                slot -= 1
+            colors[0] = color
+            bufs[0] = pattern
+            lens[0] = n
+        return pattern
+
+    def _fill_blocks(self, blocks, x0, y0, color):
+        """Draw rasterized (x, y, w, h) blocks.
+
+        Args:
+            blocks (array): Blocks relative to x0, y0.
+            x0, y0 (int): Coordinates of the shape origin.
+            color (int): RGB565 color value.
+        """
+        for i in range(0, len(blocks), 4):
+            self.fill_hrect(x0 + blocks[i], y0 + blocks[i + 1],
+                            blocks[i + 2], blocks[i + 3], color)
+
+    def _get_spans(self, key, rasterize, *args):
+        """Return cached blocks for a shape, rasterizing on a miss.
+
+        Args:
+            key (tuple): Shape geometry (kind and size, not position).
+            rasterize (function): Block generator called with args.
+        """
+        blocks = self.span_cache.get(key)
+        if blocks is None:
+            blocks = rasterize(*args)
+            self.span_cache.put(key, blocks, len(blocks) * 2)
+        return blocks
+
+    def _blit_clipped(self, buf, x, y, w, h):
+        """Write a w x h RGB565 buffer, drawing only its visible part.
+
+        Args:
+            buf (bytes): Pixel data, row by row.
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of buffer.
+            h (int): Height of buffer.
+        """
+        clip = self._clip_rect(x, y, w, h)
+        if clip is None:
+            return
+        cx, cy, cw, ch = clip
+        src = memoryview(buf)
+        row = w * 2
+        start = ((cy - y) * w + cx - x) * 2
+        if cw == w:
+            # Rows are still contiguous, no copy needed
+            self.block(cx, cy, cx + cw - 1, cy + ch - 1,
+                       src[start:start + ch * row])
+            return
+        size = cw * 2
+        out = bytearray(size * ch)
+        for i in range(ch):
+            out[i * size:(i + 1) * size] = src[start:start + size]
+            start += row
+        self.block(cx, cy, cx + cw - 1, cy + ch - 1, out)
+
+    def _clip_line(self, x1, y1, x2, y2):
+        """Trim a line to the screen (Cohen-Sutherland).
+
+        Args:
+            x1, y1 (int): Starting coordinates of the line
+            x2, y2 (int): Ending coordinates of the line
+        Returns:
+            tuple: Visible (x1, y1, x2, y2) or None when fully off screen.
+        """
+        xmax = self.width - 1
+        ymax = self.height - 1
+        c1 = self._outcode(x1, y1)
+        c2 = self._outcode(x2, y2)
+        if not (c1 | c2):
+            return x1, y1, x2, y2
+        self.clipped += 1
+        while c1 | c2:
+            if c1 & c2:
+                self.clipped -= 1
+                self.rejected += 1
+                return None
+            c = c1 or c2
+            if c & 8:
+                x = x1 + (x2 - x1) * (ymax - y1) / (y2 - y1)
+                y = ymax
+            elif c & 4:
+                x = x1 + (x2 - x1) * -y1 / (y2 - y1)
+                y = 0
+            elif c & 2:
+                y = y1 + (y2 - y1) * (xmax - x1) / (x2 - x1)
+                x = xmax
+            else:
+                y = y1 + (y2 - y1) * -x1 / (x2 - x1)
+                x = 0
+            x = int(x + 0.5)
+            y = int(y + 0.5)
+            if c == c1:
+                x1, y1 = x, y
+                c1 = self._outcode(x1, y1)
+            else:
+                x2, y2 = x, y
+                c2 = self._outcode(x2, y2)
+        return x1, y1, x2, y2
+
+    def _clip_rect(self, x, y, w, h):
+        """Trim a rectangle to the screen.
+
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of rectangle.
+            h (int): Height of rectangle.
+        Returns:
+            tuple: Visible (x, y, w, h) or None when nothing is visible.
+        """
+        if (x >= 0 and y >= 0 and x + w <= self.width and
+                y + h <= self.height and w > 0 and h > 0):
+            return x, y, w, h
+        x2 = min(x + w, self.width)
+        y2 = min(y + h, self.height)
+        x = max(x, 0)
+        y = max(y, 0)
+        if x >= x2 or y >= y2:
+            self.rejected += 1
+            return None
+        self.clipped += 1
+        return x, y, x2 - x, y2 - y
+
+    def _outcode(self, x, y):
+        """Return the Cohen-Sutherland region code of a point."""
+        code = 0
+        if x < 0:
+            code = 1
+        elif x >= self.width:
+            code = 2
+        if y < 0:
+            code |= 4
+        elif y >= self.height:
+            code |= 8
+        return code
+
+    def draw_arc(self, x0, y0, r, start, end, color, thickness=1):
+        """Draw an arc of a circle outline.
+
+        Args:
+            x0, y0 (int): Coordinates of center point.
+            r (int): Outer radius.
+            start (float): Start angle in degrees, 0 points right and
+                angles increase clockwise.
+            end (float): End angle in degrees, may wrap past 0 (start + 360
+                for a ring).
+            color (int): RGB565 color value.
+            thickness (Optional int): Width of the arc, drawn inwards from
+                the radius (default: 1).
+        """
+        inner = r - thickness
+        blocks = self._get_spans(('a', r, inner, start, end), arc_spans,
+                                 r, inner, start, end)
+        self._fill_blocks(blocks, x0, y0, color)
+
     def draw_circle(self, x0, y0, r, color):
         """Draw a circle.
 
@@ -215,31 +1338,8 @@ class Display(object):
             r (int): Radius.
             color (int): RGB565 color value.
         """
-        f = 1 - r
-        dx = 1
-        dy = -r - r
-        x = 0
-        y = r
-        self.draw_pixel(x0, y0 + r, color)
-        self.draw_pixel(x0, y0 - r, color)
-        self.draw_pixel(x0 + r, y0, color)
-        self.draw_pixel(x0 - r, y0, color)
-        while x < y:
-            if f >= 0:
-                y -= 1
-                dy += 2
-                f += dy
-            x += 1
-            dx += 2
-            f += dx
-            self.draw_pixel(x0 + x, y0 + y, color)
-            self.draw_pixel(x0 - x, y0 + y, color)
-            self.draw_pixel(x0 + x, y0 - y, color)
-            self.draw_pixel(x0 - x, y0 - y, color)
-            self.draw_pixel(x0 + y, y0 + x, color)
-            self.draw_pixel(x0 - y, y0 + x, color)
-            self.draw_pixel(x0 + y, y0 - x, color)
-            self.draw_pixel(x0 - y, y0 - x, color)
+        blocks = self._get_spans(('co', r), circle_outline_spans, r)
+        self._fill_blocks(blocks, x0, y0, color)
 
     def draw_ellipse(self, x0, y0, a, b, color):
         """Draw an ellipse.
@@ -255,96 +1355,336 @@ class Display(object):
             up to complete on a full pixel.  Therefore the major and
             minor axes are increased by 1.
         """
-        a2 = a * a
-        b2 = b * b
-        twoa2 = a2 + a2
-        twob2 = b2 + b2
-        x = 0
-        y = b
-        px = 0
-        py = twoa2 * y
-        # Plot initial points
-        self.draw_pixel(x0 + x, y0 + y, color)
-        self.draw_pixel(x0 - x, y0 + y, color)
-        self.draw_pixel(x0 + x, y0 - y, color)
-        self.draw_pixel(x0 - x, y0 - y, color)
-        # Region 1
-        p = round(b2 - (a2 * b) + (0.25 * a2))
-        while px < py:
-            x += 1
-            px += twob2
-            if p < 0:
-                p += b2 + px
-            else:
-                y -= 1
-                py -= twoa2
-                p += b2 + px - py
-            self.draw_pixel(x0 + x, y0 + y, color)
-            self.draw_pixel(x0 - x, y0 + y, color)
-            self.draw_pixel(x0 + x, y0 - y, color)
-            self.draw_pixel(x0 - x, y0 - y, color)
-        # Region 2
-        p = round(b2 * (x + 0.5) * (x + 0.5) +
-                  a2 * (y - 1) * (y - 1) - a2 * b2)
-        while y > 0:
-            y -= 1
-            py -= twoa2
-            if p > 0:
-                p += a2 - py
-            else:
-                x += 1
-                px += twob2
-                p += a2 - py + px
-            self.draw_pixel(x0 + x, y0 + y, color)
-            self.draw_pixel(x0 - x, y0 + y, color)
-            self.draw_pixel(x0 + x, y0 - y, color)
-            self.draw_pixel(x0 - x, y0 - y, color)
+        blocks = self._get_spans(('eo', a, b), ellipse_outline_spans, a, b)
+        self._fill_blocks(blocks, x0, y0, color)
 
     def draw_hline(self, x, y, w, color):
         """Draw a horizontal line.
 
         Args:
-            x (int): Starting X position.
-            y (int): Starting Y position.
-            w (int): Width of line.
-            color (int): RGB565 color value.
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of line.
+            color (int): RGB565 color value.
+        """
+        clip = self._clip_rect(x, y, w, 1)
+        if clip is None:
+            return
+        self._fill_block(clip[0], clip[1], clip[2], 1, color)
+
+    def draw_image(self, path, x=0, y=0, w=320, h=240, sx=0, sy=0,
+                   stride=None, threaded=False):
+        """Draw image from flash.
+
+        Args:
+            path (string): Image file path.
+            x (int): X coordinate of image left.  Default is 0.
+            y (int): Y coordinate of image top.  Default is 0.
+            w (int): Width of image.  Default is 320.
+            h (int): Height of image.  Default is 240.
+            sx, sy (int): Top left of the drawn area inside the image file.
+                Default is 0, 0.
+            stride (Optional int): Width of the image stored in the file,
+                for drawing part of a larger image.  Default is w.
+            threaded (bool): Read the next chunk on a background thread
+                while the current one is sent (default False).
+        Note:
+            Only the rows and columns that end up on the screen are read.
+            Reading ahead from a file on the display's own SPI bus (the
+            SD card) needs the display's bus_lock, shared with the SD
+            driver, and cannot be done inside a bus session.
+        """
+        if stride is None:
+            stride = w
+        clip = self._clip_rect(x, y, w, h)
+        if clip is None:
+            return
+        cx, cy, cw, ch = clip
+        offset = ((sy + cy - y) * stride + sx + cx - x) * 2
+        with open(path, "rb") as f:
+            if threaded and _thread is not None:
+                self._stream_image_threaded(f, offset, stride * 2,
+                                            cx, cy, cw, ch)
+                return
+            buf = self._xfer_buf(0)
+            row = cw * 2
+            rows = max(1, len(buf) // row)
+            chunk_y = cy
+            while chunk_y < cy + ch:
+                n = min(rows, cy + ch - chunk_y)
+                self._read_rows(f, buf, offset, n, row, stride * 2)
+                self.block(cx, chunk_y, cx + cw - 1, chunk_y + n - 1,
+                           buf[:n * row])
+                offset += n * stride * 2
+                chunk_y += n
+
+    async def draw_image_async(self, path, x=0, y=0, w=320, h=240, sx=0,
+                               sy=0, stride=None):
+        """Draw image from flash, yielding to other tasks between chunks.
+
+        Args:
+            See draw_image(), except threaded.
+        """
+        if stride is None:
+            stride = w
+        clip = self._clip_rect(x, y, w, h)
+        if clip is None:
+            return
+        cx, cy, cw, ch = clip
+        offset = ((sy + cy - y) * stride + sx + cx - x) * 2
+        with open(path, "rb") as f:
+            buf = self._xfer_buf(0)
+            row = cw * 2
+            rows = max(1, len(buf) // row)
+            chunk_y = cy
+            while chunk_y < cy + ch:
+                n = min(rows, cy + ch - chunk_y)
+                self._read_rows(f, buf, offset, n, row, stride * 2)
+                self.block(cx, chunk_y, cx + cw - 1, chunk_y + n - 1,
+                           buf[:n * row])
+                offset += n * stride * 2
+                chunk_y += n
+                await self._yield_slice()
+
+    def _read_rows(self, f, buf, offset, n, row, stride):
+        """Read rows of an image file into a buffer without allocating.
+
+        Args:
+            f (file): Open image file.
+            buf (memoryview): Destination buffer.
+            offset (int): File offset of the first row.
+            n (int): Number of rows.
+            row (int): Bytes to read per row.
+            stride (int): Bytes per row in the file.
+        """
+        if row == stride:
+            # Whole rows are contiguous in the file
+            f.seek(offset)
+            f.readinto(buf[:n * row])
+            return
+        for i in range(n):
+            f.seek(offset)
+            f.readinto(buf[i * row:(i + 1) * row])
+            offset += stride
+
+    def _stream_image_threaded(self, f, offset, stride, x, y, w, h):
+        """Blit image rows while a background thread reads ahead.
+
+        Args:
+            f (file): Open image file.
+            offset (int): File offset of the first visible row.
+            stride (int): Bytes per row in the file.
+            x, y, w, h (int): Visible screen rectangle.
+        Note:
+            Two transfer buffers are handed back and forth with locks:
+            the reader fills one while the other is being sent.  With a
+            bus_lock the reads and writes take turns on the bus.  If a
+            write fails the reader is stopped and has exited before the
+            error is raised.
+        """
+        bus = self.bus_lock
+        if bus is not None and self._session_depth:
+            raise RuntimeError('Threaded draw_image on a shared bus cannot '
+                               'run inside a bus session.')
+        bufs = (self._xfer_buf(0), self._xfer_buf(1))
+        row = w * 2
+        rows = max(1, len(bufs[0]) // row)
+        chunks = (h + rows - 1) // rows
+        free = (_thread.allocate_lock(), _thread.allocate_lock())
+        ready = (_thread.allocate_lock(), _thread.allocate_lock())
+        ready[0].acquire()
+        ready[1].acquire()
+        error = []
+
+        def reader():
+            pos = offset
+            for k in range(chunks):
+                i = k & 1
+                free[i].acquire()
+                try:
+                    if not error:
+                        n = min(rows, h - k * rows)
+                        if bus is not None:
+                            bus.acquire()
+                        try:
+                            self._read_rows(f, bufs[i], pos, n, row, stride)
+                        finally:
+                            if bus is not None:
+                                bus.release()
+                        pos += n * stride
+                except Exception as e:
+                    error.append(e)
+                ready[i].release()
+
+        _thread.start_new_thread(reader, ())
+        k = 0
+        try:
+            while k < chunks:
+                i = k & 1
+                ready[i].acquire()
+                try:
+                    if not error:
+                        n = min(rows, h - k * rows)
+                        chunk_y = y + k * rows
+                        if bus is not None:
+                            bus.acquire()
+                        try:
+                            self.block(x, chunk_y, x + w - 1,
+                                       chunk_y + n - 1, bufs[i][:n * row])
+                        finally:
+                            if bus is not None:
+                                bus.release()
+                finally:
+                    free[i].release()
+                    k += 1
+        finally:
+            if k < chunks:
+                # Stop reading and hand the reader its remaining buffers
+                # until it exits, the caller closes the file next
+                error.append(None)
+                while k < chunks:
+                    i = k & 1
+                    ready[i].acquire()
+                    free[i].release()
+                    k += 1
+        if error:
+            raise error[0]
+
+    async def _yield_slice(self):
+        """Yield to other tasks once the time slice is used up.
+
+        Note:
+            Called after each chunk by the *_async methods.  The watchdog is
+            fed on every yield so a long redraw cannot trip it.
         """
-        if self.is_off_grid(x, y, x + w - 1, y):
+        if ticks_diff(ticks_ms(), self._slice_start) < self.slice_ms:
             return
-        line = color.to_bytes(2, 'big') * w
-        self.block(x, y, x + w - 1, y, line)
+        if self.wdt is not None:
+            self.wdt.feed()
+        await asyncio.sleep(0)
+        self._slice_start = ticks_ms()
 
-    def draw_image(self, path, x=0, y=0, w=320, h=240):
-        """Draw image from flash.
+    def _xfer_buf(self, i):
+        """Return reusable transfer buffer i (0 or 1) of chunk_size bytes.
+
+        Args:
+            i (int): Buffer number.
+        """
+        buf = self._xfer_bufs[i]
+        if buf is None:
+            buf = memoryview(bytearray(self.chunk_size))
+            self._xfer_bufs[i] = buf
+        return buf
+
+    def draw_rle_image(self, path, x=0, y=0):
+        """Draw a run-length encoded RGB565 image (see tools/img2rle.py).
 
         Args:
             path (string): Image file path.
             x (int): X coordinate of image left.  Default is 0.
             y (int): Y coordinate of image top.  Default is 0.
-            w (int): Width of image.  Default is 320.
-            h (int): Height of image.  Default is 240.
+        Note:
+            Rows are decoded straight into the transfer buffers, so RAM
+            use is two chunk_size buffers regardless of image size.  The
+            row offset table lets clipped rows be skipped without reading.
         """
-        x2 = x + w - 1
-        y2 = y + h - 1
-        if self.is_off_grid(x, y, x2, y2):
-            return
         with open(path, "rb") as f:
-            chunk_height = 1024 // w
-            chunk_count, remainder = divmod(h, chunk_height)
-            chunk_size = chunk_height * w * 2
-            chunk_y = y
-            if chunk_count:
-                for c in range(0, chunk_count):
-                    buf = f.read(chunk_size)
-                    self.block(x, chunk_y,
-                               x2, chunk_y + chunk_height - 1,
-                               buf)
-                    chunk_y += chunk_height
-            if remainder:
-                buf = f.read(remainder * w * 2)
-                self.block(x, chunk_y,
-                           x2, chunk_y + remainder - 1,
-                           buf)
+            head = f.read(10)
+            if head[:4] != b'R565':
+                raise ValueError('Not an R565 image: {0}'.format(path))
+            w = head[4] << 8 | head[5]
+            h = head[6] << 8 | head[7]
+            colors = head[8] << 8 | head[9]
+            clip = self._clip_rect(x, y, w, h)
+            if clip is None:
+                return
+            cx, cy, cw, ch = clip
+            palette = f.read(colors * 2) if colors else None
+            table = 10 + colors * 2
+            data = table + (h + 1) * 4
+            # Offsets of the visible rows plus the end of the last one
+            f.seek(table + (cy - y) * 4)
+            offsets = f.read((ch + 1) * 4)
+            f.seek(data + int.from_bytes(offsets[:4], 'big'))
+            src = self._xfer_buf(1)
+            out = self._xfer_buf(0)
+            row = w * 2
+            line = out if cw == w else memoryview(bytearray(row))
+            size = cw * 2
+            skip = (cx - x) * 2
+            rows = max(1, len(out) // size)
+            filled = 0
+            chunk_y = cy
+            start = int.from_bytes(offsets[:4], 'big')
+            for r in range(ch):
+                end = int.from_bytes(offsets[r * 4 + 4:r * 4 + 8], 'big')
+                n = end - start
+                start = end
+                buf = src if n <= len(src) else memoryview(bytearray(n))
+                f.readinto(buf[:n])
+                if line is out:
+                    self._rle_row(buf, n, out, filled * size, palette)
+                else:
+                    self._rle_row(buf, n, line, 0, palette)
+                    at = filled * size
+                    out[at:at + size] = line[skip:skip + size]
+                filled += 1
+                if filled == rows or r == ch - 1:
+                    self.block(cx, chunk_y, cx + cw - 1, chunk_y + filled - 1,
+                               out[:filled * size])
+                    chunk_y += filled
+                    filled = 0
+
+    def _rle_row(self, src, n, dst, o, palette):
+        """Decode one run-length encoded row into RGB565 bytes.
+
+        Args:
+            src (memoryview): Encoded row.
+            n (int): Length of the encoded row.
+            dst (memoryview): Destination buffer.
+            o (int): Offset in dst to write to.
+            palette (bytes): RGB565 palette or None for 16-bit values.
+        Note:
+            Each packet starts with a count byte c.  If c & 0x80 the next
+            value repeats (c & 0x7F) + 1 times, otherwise c + 1 values
+            follow.  Values are palette indexes or big-endian RGB565.
+        """
+        i = 0
+        while i < n:
+            c = src[i]
+            i += 1
+            if c & 0x80:
+                count = (c & 0x7F) + 1
+                if palette:
+                    v = src[i] * 2
+                    dst[o] = palette[v]
+                    dst[o + 1] = palette[v + 1]
+                    i += 1
+                else:
+                    dst[o] = src[i]
+                    dst[o + 1] = src[i + 1]
+                    i += 2
+                # Double the run in place
+                done = 2
+                size = count * 2
+                while done < size:
+                    k = min(done, size - done)
+                    dst[o + done:o + done + k] = dst[o:o + k]
+                    done += k
+                o += size
+            else:
+                count = c + 1
+                if palette:
+                    for k in range(i, i + count):
+                        v = src[k] * 2
+                        dst[o] = palette[v]
+                        dst[o + 1] = palette[v + 1]
+                        o += 2
+                    i += count
+                else:
+                    dst[o:o + count * 2] = src[i:i + count * 2]
+                    o += count * 2
+                    i += count * 2
 
     def draw_letter(self, x, y, letter, font, color, background=0,
                     landscape=False):
@@ -359,26 +1699,39 @@ class Display(object):
             background (int): RGB565 background color (default: black).
             landscape (bool): Orientation (default: False = portrait)
         """
-        buf, w, h = font.get_letter(letter, color, background, landscape)
+        buf, w, h = self._get_glyph(letter, font, color, background,
+                                    landscape)
         # Check for errors (Font could be missing specified letter)
         if w == 0:
             return w, h
 
         if landscape:
-            y -= w
-            if self.is_off_grid(x, y, x + h - 1, y + w - 1):
-                return 0, 0
-            self.block(x, y,
-                       x + h - 1, y + w - 1,
-                       buf)
+            self._blit_clipped(buf, x, y - w, h, w)
         else:
-            if self.is_off_grid(x, y, x + w - 1, y + h - 1):
-                return 0, 0
-            self.block(x, y,
-                       x + w - 1, y + h - 1,
-                       buf)
+            self._blit_clipped(buf, x, y, w, h)
         return w, h
 
+    def _get_glyph(self, letter, font, color, background, landscape):
+        """Return a rendered letter, from the glyph cache when possible.
+
+        Args:
+            letter (string): Letter to render.
+            font (XglcdFont object): Font.
+            color (int): RGB565 color value.
+            background (int): RGB565 background color.
+            landscape (bool): Orientation.
+        Returns:
+            tuple: (RGB565 buffer, width, height) as font.get_letter().
+        """
+        key = (font, letter, color, background, landscape)
+        glyph = self.glyph_cache.get(key)
+        if glyph is None:
+            glyph = font.get_letter(letter, color, background, landscape)
+            # Missing letters come back with zero width, don't cache them
+            if glyph[1]:
+                self.glyph_cache.put(key, glyph, len(glyph[0]))
+        return glyph
+
     def draw_line(self, x1, y1, x2, y2, color):
         """Draw a line using Bresenham's algorithm.
 
@@ -399,9 +1752,10 @@ class Display(object):
                 y1, y2 = y2, y1
             self.draw_vline(x1, y1, y2 - y1 + 1, color)
             return
-        # Confirm coordinates in boundary
-        if self.is_off_grid(min(x1, x2), min(y1, y2),
-                            max(x1, x2), max(y1, y2)):
+        # Find the visible part, the line itself keeps its endpoints so
+        # the pixels match the unclipped line
+        clip = self._clip_line(x1, y1, x2, y2)
+        if clip is None:
             return
         # Changes in x, y
         dx = x2 - x1
@@ -421,16 +1775,29 @@ class Display(object):
         dy = y2 - y1
         # Calculate error
         error = dx >> 1
+        ady = abs(dy)
         ystep = 1 if y1 < y2 else -1
-        y = y1
-        for x in range(x1, x2 + 1):
-            # Had to reverse HW ????
-            if not is_steep:
-                self.draw_pixel(x, y, color)
-            else:
-                self.draw_pixel(y, x, color)
-            error -= abs(dy)
-            if error < 0:
+        # Only step through the visible range.  A clip point on the minor
+        # axis edge is rounded, so allow one run of slack, the runs
+        # themselves are clipped by draw_hline/draw_vline
+        a, b = (clip[1], clip[3]) if is_steep else (clip[0], clip[2])
+        slack = dx // ady + 1
+        first = max(x1, min(a, b) - slack)
+        last = min(x2, max(a, b) + slack)
+        # Error term and y after the steps skipped before first
+        skipped = -((error - (first - x1) * ady) // dx)
+        error += skipped * dx - (first - x1) * ady
+        y = y1 + skipped * ystep
+        start = first
+        # Pixels sharing a row (column when steep) are drawn as one run
+        for x in range(first, last + 1):
+            error -= ady
+            if error < 0 or x == last:
+                if not is_steep:
+                    self.draw_hline(start, y, x - start + 1, color)
+                else:
+                    self.draw_vline(y, start, x - start + 1, color)
+                start = x + 1
                 y += ystep
                 error += dx
 
@@ -457,9 +1824,19 @@ class Display(object):
             y (int): Y position.
             color (int): RGB565 color value.
         """
-        if self.is_off_grid(x, y, x, y):
+        if x < 0 or y < 0 or x >= self.width or y >= self.height:
+            self.rejected += 1
             return
-        self.block(x, y, x, y, color.to_bytes(2, 'big'))
+        if self._fb is not None:
+            offset = (y * self.width + x) * 2
+            self._fb[offset] = color >> 8
+            self._fb[offset + 1] = color & 0xFF
+            self._mark_dirty(x, y, x, y)
+            return
+        buf = self._px_buf
+        buf[0] = color >> 8
+        buf[1] = color & 0xFF
+        self.block(x, y, x, y, buf)
 
     def draw_polygon(self, sides, x0, y0, r, color, rotate=0):
         """Draw an n-sided regular polygon.
@@ -502,7 +1879,7 @@ class Display(object):
         self.draw_vline(x, y, h, color)
         self.draw_vline(x2, y, h, color)
 
-    def draw_sprite(self, buf, x, y, w, h):
+    def draw_sprite(self, buf, x, y, w, h, key=None, runs=None):
         """Draw a sprite (optimized for horizontal drawing).
 
         Args:
@@ -511,12 +1888,31 @@ class Display(object):
             y (int): Starting Y position.
             w (int): Width of drawing.
             h (int): Height of drawing.
+            key (Optional int): RGB565 color that is transparent.  Only the
+                opaque runs of each row are sent.
+            runs (Optional array): Opaque runs from sprite_runs() to reuse
+                instead of scanning buf for key.
         """
-        x2 = x + w - 1
-        y2 = y + h - 1
-        if self.is_off_grid(x, y, x2, y2):
+        if key is None and runs is None:
+            self._blit_clipped(buf, x, y, w, h)
             return
-        self.block(x, y, x2, y2, buf)
+        if runs is None:
+            runs = self.sprite_runs(buf, w, h, key)
+        src = memoryview(buf)
+        i = 0
+        n = len(runs)
+        while i < n:
+            ry, rx, rw = runs[i], runs[i + 1], runs[i + 2]
+            i += 3
+            rh = 1
+            if rw == w:
+                # Consecutive full rows are contiguous, send them together
+                while i < n and runs[i] == ry + rh and runs[i + 2] == w:
+                    rh += 1
+                    i += 3
+            start = (ry * w + rx) * 2
+            self._blit_clipped(src[start:start + rw * rh * 2], x + rx,
+                               y + ry, rw, rh)
 
     def draw_text(self, x, y, text, font, color,  background=0,
                   landscape=False, spacing=1):
@@ -531,34 +1927,209 @@ class Display(object):
             background (int): RGB565 background color (default: black).
             landscape (bool): Orientation (default: False = portrait)
             spacing (int): Pixels between letters (default: 1)
+        Note:
+            Letters and spacing are composed into one buffer and sent with
+            a single block() per run (split only when the run is larger
+            than chunk_size).
         """
+        limit = len(self._xfer_buf(0))
+        run = []
+        size = 0
+        # Height of the letters gathered in run
+        run_h = 0
         for letter in text:
             # Get letter array and letter dimensions
-            w, h = self.draw_letter(x, y, letter, font, color, background,
-                                    landscape)
+            buf, w, h = self._get_glyph(letter, font, color, background,
+                                        landscape)
             # Stop on error
             if w == 0 or h == 0:
+                if run:
+                    self._draw_run(run, x, y, run_h, background, landscape,
+                                   spacing)
                 print('Invalid width {0} or height {1}'.format(w, h))
                 return
+            need = (w + spacing) * h * 2
+            if run and size + need > limit:
+                x, y = self._draw_run(run, x, y, run_h, background,
+                                      landscape, spacing)
+                run = []
+                size = 0
+            run.append((buf, w))
+            run_h = h
+            size += need
+        if run:
+            self._draw_run(run, x, y, run_h, background, landscape, spacing)
+
+    def _draw_run(self, run, x, y, h, background, landscape, spacing):
+        """Compose letters and spacing into one buffer and blit it.
+
+        Args:
+            run (list): (RGB565 buffer, width) of each letter.
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            h (int): Letter height.
+            background (int): RGB565 background color.
+            landscape (bool): Orientation.
+            spacing (int): Pixels between letters.
+        Returns:
+            tuple: X, Y position for the next letter.
+        """
+        total = 0
+        for _, w in run:
+            total += w + spacing
+        size = total * h * 2
+        if size > len(self._xfer_buf(0)):
+            # A single letter larger than the transfer buffer
+            return self._draw_run_letters(run, x, y, h, background,
+                                          landscape, spacing)
+        out = self._xfer_buf(0)
+        if spacing:
+            out[:size] = self._fill_pattern(background, size)[:size]
+        if landscape:
+            # Letters stack upwards, so the last one is at the top
+            o = 0
+            gap = spacing * h * 2
+            for i in range(len(run) - 1, -1, -1):
+                buf, w = run[i]
+                o += gap
+                out[o:o + w * h * 2] = buf
+                o += w * h * 2
+            self._blit_clipped(out[:size], x, y - total, h, total)
+            return x, y - total
+        stride = total * 2
+        col = 0
+        for buf, w in run:
+            src = memoryview(buf)
+            row = w * 2
+            o = col
+            for r in range(0, h * row, row):
+                out[o:o + row] = src[r:r + row]
+                o += stride
+            col += (w + spacing) * 2
+        self._blit_clipped(out[:size], x, y, total, h)
+        return x + total, y
+
+    def _draw_run_letters(self, run, x, y, h, background, landscape,
+                          spacing):
+        """Draw letters one block each (for letters too big to compose).
 
+        Args:
+            See _draw_run().
+        Returns:
+            tuple: X, Y position for the next letter.
+        """
+        for buf, w in run:
             if landscape:
-                # Fill in spacing
+                self._blit_clipped(buf, x, y - w, h, w)
                 if spacing:
                     self.fill_hrect(x, y - w - spacing, h, spacing, background)
-                # Position y for next letter
-                y -= (w + spacing)
+                y -= w + spacing
             else:
-                # Fill in spacing
+                self._blit_clipped(buf, x, y, w, h)
                 if spacing:
                     self.fill_hrect(x + w, y, spacing, h, background)
-                # Position x for next letter
-                x += (w + spacing)
+                x += w + spacing
+        return x, y
+
+    def draw_text_box(self, x, y, w, h, text, font, color, background=0,
+                      landscape=False, spacing=1, line_spacing=0):
+        """Draw text word wrapped inside a box.
+
+        Args:
+            x (int): Left of the box.
+            y (int): Top of the box.
+            w (int): Width of the box.
+            h (int): Height of the box.
+            text (string): Text to draw, newlines start a new line.
+            font (XglcdFont object): Font.
+            color (int): RGB565 color value.
+            background (int): RGB565 background color (default: black).
+            landscape (bool): Orientation (default: False = portrait).
+                Landscape lines run bottom to top and advance to the right.
+            spacing (int): Pixels between letters (default: 1)
+            line_spacing (int): Pixels between lines (default: 0)
+        Returns:
+            int: Number of lines drawn (lines that do not fit are dropped).
+        """
+        length, depth = (h, w) if landscape else (w, h)
+        step = font.height + line_spacing
+        lines = self.wrap_text(text, font, length, spacing)
+        count = min(len(lines), (depth + line_spacing) // step)
+        for i in range(count):
+            if landscape:
+                self.draw_text(x + i * step, y + h, lines[i], font, color,
+                               background, True, spacing)
+            else:
+                self.draw_text(x, y + i * step, lines[i], font, color,
+                               background, False, spacing)
+        return count
 
-                # # Fill in spacing
-                # if spacing:
-                #     self.fill_vrect(x + w, y, spacing, h, background)
-                # # Position x for next letter
-                # x += w + spacing
+    def measure_text(self, text, font, spacing=1):
+        """Measure text without drawing it.
+
+        Args:
+            text (string): Text to measure.
+            font (XglcdFont object): Font.
+            spacing (int): Pixels between letters (default: 1)
+        Returns:
+            tuple: (length, height) in pixels.  Length runs along the text
+                direction, so in landscape it is the vertical extent.
+        """
+        return font.measure_text(text, spacing), font.height
+
+    def wrap_text(self, text, font, width, spacing=1):
+        """Split text into lines no longer than width.
+
+        Args:
+            text (string): Text to wrap, newlines are kept as line breaks.
+            font (XglcdFont object): Font.
+            width (int): Maximum line length in pixels.
+            spacing (int): Pixels between letters (default: 1)
+        Returns:
+            list: Lines of text.  Words longer than width are broken.
+        """
+        # measure_text counts spacing after the last letter too
+        limit = width + spacing
+        lines = []
+        for paragraph in text.split('\n'):
+            line = ''
+            for word in paragraph.split(' '):
+                candidate = line + ' ' + word if line else word
+                if font.measure_text(candidate, spacing) <= limit:
+                    line = candidate
+                    continue
+                if line:
+                    lines.append(line)
+                while len(word) > 1 and font.measure_text(word,
+                                                          spacing) > limit:
+                    n = len(word) - 1
+                    while n > 1 and font.measure_text(word[:n],
+                                                      spacing) > limit:
+                        n -= 1
+                    lines.append(word[:n])
+                    word = word[n:]
+                line = word
+            lines.append(line)
+        return lines
+
+    def draw_thick_line(self, x1, y1, x2, y2, width, color, rounded=False):
+        """Draw a line several pixels wide.
+
+        Args:
+            x1, y1 (int): Starting coordinates of the line
+            x2, y2 (int): Ending coordinates of the line
+            width (int): Line width in pixels.
+            color (int): RGB565 color value.
+            rounded (Optional bool): Round caps at both ends (default: False)
+        """
+        if width <= 1:
+            self.draw_line(x1, y1, x2, y2, color)
+            return
+        dx = x2 - x1
+        dy = y2 - y1
+        blocks = self._get_spans(('l', dx, dy, width, rounded),
+                                 thick_line_spans, dx, dy, width, rounded)
+        self._fill_blocks(blocks, x1, y1, color)
 
     def draw_vline(self, x, y, h, color):
         """Draw a vertical line.
@@ -569,11 +2140,37 @@ class Display(object):
             h (int): Height of line.
             color (int): RGB565 color value.
         """
-        # Confirm coordinates in boundary
-        if self.is_off_grid(x, y, x, y + h - 1):
+        clip = self._clip_rect(x, y, 1, h)
+        if clip is None:
             return
-        line = color.to_bytes(2, 'big') * h
-        self.block(x, y, x, y + h - 1, line)
+        self._fill_block(clip[0], clip[1], 1, clip[3], color)
+
+    def fill_arc(self, x0, y0, r, start, end, color):
+        """Draw a filled pie slice.
+
+        Args:
+            x0, y0 (int): Coordinates of center point.
+            r (int): Radius.
+            start (float): Start angle in degrees, 0 points right and
+                angles increase clockwise.
+            end (float): End angle in degrees, may wrap past 0.
+            color (int): RGB565 color value.
+        """
+        blocks = self._get_spans(('a', r, -1, start, end), arc_spans,
+                                 r, -1, start, end)
+        self._fill_blocks(blocks, x0, y0, color)
+
+    async def _fill_blocks_async(self, blocks, x0, y0, color):
+        """Draw rasterized (x, y, w, h) blocks, yielding between them.
+
+        Args:
+            blocks (array): Blocks relative to x0, y0.
+            x0, y0 (int): Coordinates of the shape origin.
+            color (int): RGB565 color value.
+        """
+        for i in range(0, len(blocks), 4):
+            await self.fill_hrect_async(x0 + blocks[i], y0 + blocks[i + 1],
+                                        blocks[i + 2], blocks[i + 3], color)
 
     def fill_circle(self, x0, y0, r, color):
         """Draw a filled circle.
@@ -584,24 +2181,17 @@ class Display(object):
             r (int): Radius.
             color (int): RGB565 color value.
         """
-        f = 1 - r
-        dx = 1
-        dy = -r - r
-        x = 0
-        y = r
-        self.draw_vline(x0, y0 - r, 2 * r + 1, color)
-        while x < y:
-            if f >= 0:
-                y -= 1
-                dy += 2
-                f += dy
-            x += 1
-            dx += 2
-            f += dx
-            self.draw_vline(x0 + x, y0 - y, 2 * y + 1, color)
-            self.draw_vline(x0 - x, y0 - y, 2 * y + 1, color)
-            self.draw_vline(x0 - y, y0 - x, 2 * x + 1, color)
-            self.draw_vline(x0 + y, y0 - x, 2 * x + 1, color)
+        self._fill_blocks(self._get_spans(('c', r), circle_spans, r),
+                         x0, y0, color)
+
+    async def fill_circle_async(self, x0, y0, r, color):
+        """Draw a filled circle, yielding to other tasks between blocks.
+
+        Args:
+            See fill_circle().
+        """
+        await self._fill_blocks_async(
+            self._get_spans(('c', r), circle_spans, r), x0, y0, color)
 
     def fill_ellipse(self, x0, y0, a, b, color):
         """Draw a filled ellipse.
@@ -617,43 +2207,17 @@ class Display(object):
             up to complete on a full pixel.  Therefore the major and
             minor axes are increased by 1.
         """
-        a2 = a * a
-        b2 = b * b
-        twoa2 = a2 + a2
-        twob2 = b2 + b2
-        x = 0
-        y = b
-        px = 0
-        py = twoa2 * y
-        # Plot initial points
-        self.draw_line(x0, y0 - y, x0, y0 + y, color)
-        # Region 1
-        p = round(b2 - (a2 * b) + (0.25 * a2))
-        while px < py:
-            x += 1
-            px += twob2
-            if p < 0:
-                p += b2 + px
-            else:
-                y -= 1
-                py -= twoa2
-                p += b2 + px - py
-            self.draw_line(x0 + x, y0 - y, x0 + x, y0 + y, color)
-            self.draw_line(x0 - x, y0 - y, x0 - x, y0 + y, color)
-        # Region 2
-        p = round(b2 * (x + 0.5) * (x + 0.5) +
-                  a2 * (y - 1) * (y - 1) - a2 * b2)
-        while y > 0:
-            y -= 1
-            py -= twoa2
-            if p > 0:
-                p += a2 - py
-            else:
-                x += 1
-                px += twob2
-                p += a2 - py + px
-            self.draw_line(x0 + x, y0 - y, x0 + x, y0 + y, color)
-            self.draw_line(x0 - x, y0 - y, x0 - x, y0 + y, color)
+        self._fill_blocks(self._get_spans(('e', a, b), ellipse_spans, a, b),
+                         x0, y0, color)
+
+    async def fill_ellipse_async(self, x0, y0, a, b, color):
+        """Draw a filled ellipse, yielding to other tasks between blocks.
+
+        Args:
+            See fill_ellipse().
+        """
+        await self._fill_blocks_async(
+            self._get_spans(('e', a, b), ellipse_spans, a, b), x0, y0, color)
 
     def fill_hrect(self, x, y, w, h, color):
         """Draw a filled rectangle (optimized for horizontal drawing).
@@ -665,25 +2229,11 @@ class Display(object):
             h (int): Height of rectangle.
             color (int): RGB565 color value.
         """
-        if self.is_off_grid(x, y, x + w - 1, y + h - 1):
+        clip = self._clip_rect(x, y, w, h)
+        if clip is None:
             return
-        chunk_height = 1024 // w
-        chunk_count, remainder = divmod(h, chunk_height)
-        chunk_size = chunk_height * w
-        chunk_y = y
-        if chunk_count:
-            buf = color.to_bytes(2, 'big') * chunk_size
-            for c in range(0, chunk_count):
-                self.block(x, chunk_y,
-                           x + w - 1, chunk_y + chunk_height - 1,
-                           buf)
-                chunk_y += chunk_height
-
-        if remainder:
-            buf = color.to_bytes(2, 'big') * remainder * w
-            self.block(x, chunk_y,
-                       x + w - 1, chunk_y + remainder - 1,
-                       buf)
+        x, y, w, h = clip
+        self._fill_block(x, y, w, h, color)
 
     def fill_rectangle(self, x, y, w, h, color):
         """Draw a filled rectangle.
@@ -695,13 +2245,43 @@ class Display(object):
             h (int): Height of rectangle.
             color (int): RGB565 color value.
         """
-        if self.is_off_grid(x, y, x + w - 1, y + h - 1):
-            return
         if w > h:
             self.fill_hrect(x, y, w, h, color)
         else:
             self.fill_vrect(x, y, w, h, color)
 
+    async def fill_hrect_async(self, x, y, w, h, color):
+        """Draw a filled rectangle, yielding to other tasks between bands.
+
+        Args:
+            See fill_hrect().
+        Note:
+            The rectangle is sent in bands of about chunk_size bytes and the
+            task yields whenever slice_ms has passed since the last yield.
+        """
+        clip = self._clip_rect(x, y, w, h)
+        if clip is None:
+            return
+        x, y, w, h = clip
+        rows = max(1, self.chunk_size // (w * 2))
+        end = y + h
+        while y < end:
+            n = min(rows, end - y)
+            self._fill_block(x, y, w, n, color)
+            y += n
+            await self._yield_slice()
+
+    def fill_poly(self, coords, color):
+        """Draw a filled polygon with any number of vertices.
+
+        Args:
+            coords ([[int, int],...]): Vertex X, Y pairs.  Convex and
+                concave outlines are accepted and the polygon is closed
+                automatically.
+            color (int): RGB565 color value.
+        """
+        self._fill_blocks(scanline_spans(coords), 0, 0, color)
+
     def fill_polygon(self, sides, x0, y0, r, color, rotate=0):
         """Draw a filled n-sided regular polygon.
 
@@ -716,73 +2296,35 @@ class Display(object):
             Since pixels are not divisible, the radius is integer rounded
             up to complete on a full pixel.  Therefore diameter = 2 x r + 1.
         """
-        # Determine side coordinates
-        coords = []
-        theta = radians(rotate)
-        n = sides + 1
-        for s in range(n):
-            t = 2.0 * pi * s / sides + theta
-            coords.append([int(r * cos(t) + x0), int(r * sin(t) + y0)])
-        # Starting point
-        x1, y1 = coords[0]
-        # Minimum Maximum X dict
-        xdict = {y1: [x1, x1]}
-        # Iterate through coordinates
-        for row in coords[1:]:
-            x2, y2 = row
-            xprev, yprev = x2, y2
-            # Calculate perimeter
-            # Check for horizontal side
-            if y1 == y2:
-                if x1 > x2:
-                    x1, x2 = x2, x1
-                if y1 in xdict:
-                    xdict[y1] = [min(x1, xdict[y1][0]), max(x2, xdict[y1][1])]
-                else:
-                    xdict[y1] = [x1, x2]
-                x1, y1 = xprev, yprev
-                continue
-            # Non horizontal side
-            # Changes in x, y
-            dx = x2 - x1
-            dy = y2 - y1
-            # Determine how steep the line is
-            is_steep = abs(dy) > abs(dx)
-            # Rotate line
-            if is_steep:
-                x1, y1 = y1, x1
-                x2, y2 = y2, x2
-            # Swap start and end points if necessary
-            if x1 > x2:
-                x1, x2 = x2, x1
-                y1, y2 = y2, y1
-            # Recalculate differentials
-            dx = x2 - x1
-            dy = y2 - y1
-            # Calculate error
-            error = dx >> 1
-            ystep = 1 if y1 < y2 else -1
-            y = y1
-            # Calcualte minimum and maximum x values
-            for x in range(x1, x2 + 1):
-                if is_steep:
-                    if x in xdict:
-                        xdict[x] = [min(y, xdict[x][0]), max(y, xdict[x][1])]
-                    else:
-                        xdict[x] = [y, y]
-                else:
-                    if y in xdict:
-                        xdict[y] = [min(x, xdict[y][0]), max(x, xdict[y][1])]
-                    else:
-                        xdict[y] = [x, x]
-                error -= abs(dy)
-                if error < 0:
-                    y += ystep
-                    error += dx
-            x1, y1 = xprev, yprev
-        # Fill polygon
-        for y, x in xdict.items():
-            self.draw_hline(x[0], y, x[1] - x[0] + 2, color)
+        blocks = self._get_spans(('p', sides, r, rotate), polygon_spans,
+                                 sides, r, rotate)
+        self._fill_blocks(blocks, x0, y0, color)
+
+    def fill_round_rect(self, x, y, w, h, r, color):
+        """Draw a filled rectangle with rounded corners.
+
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of rectangle.
+            h (int): Height of rectangle.
+            r (int): Corner radius.
+            color (int): RGB565 color value.
+        """
+        if w <= 0 or h <= 0:
+            return
+        blocks = self._get_spans(('r', w, h, r), round_rect_spans, w, h, r)
+        self._fill_blocks(blocks, x, y, color)
+
+    async def fill_polygon_async(self, sides, x0, y0, r, color, rotate=0):
+        """Draw a filled polygon, yielding to other tasks between blocks.
+
+        Args:
+            See fill_polygon().
+        """
+        blocks = self._get_spans(('p', sides, r, rotate), polygon_spans,
+                                 sides, r, rotate)
+        await self._fill_blocks_async(blocks, x0, y0, color)
 
     def fill_vrect(self, x, y, w, h, color):
         """Draw a filled rectangle (optimized for vertical drawing).
@@ -793,26 +2335,143 @@ class Display(object):
             w (int): Width of rectangle.
             h (int): Height of rectangle.
             color (int): RGB565 color value.
+        Note:
+            The panel window is written row by row either way, so this is
+            the same transfer as fill_hrect().
+        """
+        self.fill_hrect(x, y, w, h, color)
+
+    def flush(self):
+        """Send the dirty regions of the shadow buffer to the panel.
+
+        Note:
+            Does nothing unless the display was created with buffered=True.
+        """
+        if self._fb is None or not self._dirty:
+            return
+        with self:
+            self._flush_dirty()
+        self._dirty = []
+
+    def _flush_dirty(self):
+        """Write each dirty region of the shadow buffer to the panel."""
+        fb = self._fb_mv
+        stride = self.width * 2
+        chunk = self.chunk_size
+        for x0, y0, x1, y1 in self._dirty:
+            row = (x1 - x0 + 1) * 2
+            if row == stride:
+                # Full width region is sent straight from the buffer, in
+                # chunk_size pieces
+                offset = y0 * stride
+                size = (y1 - y0 + 1) * stride
+                end = offset + size
+                self._begin_write(x0, y0, x1)
+                while offset < end:
+                    n = min(chunk, end - offset)
+                    self.write_data(fb[offset:offset + n])
+                    offset += n
+                self._end_write(x0, y0, x1, size)
+                continue
+            buf = self._xfer_buf(0)
+            rows = len(buf) // row
+            y = y0
+            while y <= y1:
+                n = min(rows, y1 - y + 1)
+                offset = y * stride + x0 * 2
+                for i in range(n):
+                    buf[i * row:(i + 1) * row] = fb[offset:offset + row]
+                    offset += stride
+                self._write_block(x0, y, x1, y + n - 1, buf[:n * row])
+                y += n
+
+    async def flush_async(self):
+        """Send the dirty regions, yielding to other tasks between chunks.
         """
-        if self.is_off_grid(x, y, x + w - 1, y + h - 1):
+        if self._fb is None or not self._dirty:
             return
-        chunk_width = 1024 // h
-        chunk_count, remainder = divmod(w, chunk_width)
-        chunk_size = chunk_width * h
-        chunk_x = x
-        if chunk_count:
-            buf = color.to_bytes(2, 'big') * chunk_size
-            for c in range(0, chunk_count):
-                self.block(chunk_x, y,
-                           chunk_x + chunk_width - 1, y + h - 1,
-                           buf)
-                chunk_x += chunk_width
-
-        if remainder:
-            buf = color.to_bytes(2, 'big') * remainder * h
-            self.block(chunk_x, y,
-                       chunk_x + remainder - 1, y + h - 1,
-                       buf)
+        fb = self._fb_mv
+        stride = self.width * 2
+        dirty = self._dirty
+        self._dirty = []
+        for x0, y0, x1, y1 in dirty:
+            row = (x1 - x0 + 1) * 2
+            buf = self._xfer_buf(0)
+            rows = len(buf) // row
+            y = y0
+            while y <= y1:
+                n = min(rows, y1 - y + 1)
+                offset = y * stride + x0 * 2
+                if row == stride:
+                    self._write_block(x0, y, x1, y + n - 1,
+                                      fb[offset:offset + n * stride])
+                else:
+                    for i in range(n):
+                        buf[i * row:(i + 1) * row] = fb[offset:offset + row]
+                        offset += stride
+                    self._write_block(x0, y, x1, y + n - 1, buf[:n * row])
+                y += n
+                await self._yield_slice()
+
+    def init_panel(self, color=0):
+        """Reset and set up the panel, clearing it while it wakes up.
+
+        Args:
+            color (Optional int): RGB565 color value (Default: 0 = Black).
+        Note:
+            The panel RAM is writable in sleep mode, so the clear is sent
+            during the wait the datasheet requires between reset and
+            SLPOUT.  Only the rest of that wait is slept.
+        """
+        self.reset()
+        start = ticks_ms()
+        self._send_table(self.INIT_TABLE)
+        self.write_cmd(self.MADCTL, self.rotation)  # Memory access ctrl
+        self.invalidate_window()
+        self.clear(color)
+        remaining = self.SLPOUT_DELAY - ticks_diff(ticks_ms(), start)
+        if remaining > 0:
+            sleep(remaining / 1000)
+        self.write_cmd(self.SLPOUT)  # Exit sleep
+        sleep(self.WAKE_DELAY / 1000)
+        self.write_cmd(self.DISPLAY_ON)  # Display on
+
+    def _send_table(self, table):
+        """Send (command, count, parameters...) entries in one session.
+
+        Args:
+            table (bytes): Command table, e.g. INIT_TABLE.
+        """
+        mv = memoryview(table)
+        i = 0
+        with self:
+            while i < len(table):
+                n = table[i + 1]
+                self.write_cmd(table[i])
+                if n:
+                    self.write_data(mv[i + 2:i + 2 + n])
+                i += 2 + n
+
+    def _panel_ready(self):
+        """Check if the panel is awake and set up for this rotation.
+
+        Returns:
+            bool: True when MADCTL and the pixel format match and the
+                panel is out of sleep with the display on.
+        Note:
+            Each read returns a dummy byte first.  Without MISO the reads
+            return 0x00 or 0xFF, which never match.
+        """
+        buf = bytearray(2)
+        values = []
+        with self:
+            for command in (self.RDMODE, self.RDMADCTL, self.RDPIXFMT):
+                self.write_cmd(command)
+                self.read_data(buf)
+                values.append(buf[1])
+        mode, madctl, pixfmt = values
+        return (mode != 0xFF and mode & 0x14 == 0x14 and
+                madctl == self.rotation and pixfmt == 0x55)
 
     def is_off_grid(self, xmin, ymin, xmax, ymax):
         """Check if coordinates extend past display boundaries.
@@ -825,21 +2484,8 @@ class Display(object):
         Returns:
             boolean: False = Coordinates OK, True = Error.
         """
-        if xmin < 0:
-            print('x-coordinate: {0} below minimum of 0.'.format(xmin))
-            return True
-        if ymin < 0:
-            print('y-coordinate: {0} below minimum of 0.'.format(ymin))
-            return True
-        if xmax >= self.width:
-            print('x-coordinate: {0} above maximum of {1}.'.format(
-                xmax, self.width - 1))
-            return True
-        if ymax >= self.height:
-            print('y-coordinate: {0} above maximum of {1}.'.format(
-                ymax, self.height - 1))
-            return True
-        return False
+        return (xmin < 0 or ymin < 0 or
+                xmax >= self.width or ymax >= self.height)
 
     def load_sprite(self, path, w, h):
         """Load sprite image.
@@ -855,15 +2501,87 @@ class Display(object):
         with open(path, "rb") as f:
             return f.read(buf_size)
 
+    def read_block(self, x, y, w, h, buf=None):
+        """Read a block of pixels back from the display.
+
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of block.
+            h (int): Height of block.
+            buf (Optional bytearray): Destination of at least w x h x 2
+                bytes (default: a new bytearray).
+        Returns:
+            bytearray: RGB565 pixels row by row, the same format block()
+                takes (buf when given).
+        Note:
+            The panel returns 3 bytes (18-bit color) per pixel after a
+            dummy byte, they are converted to RGB565 as they arrive.  MISO
+            must be connected and RAM reads are only specified up to about
+            6.6 MHz, lower the SPI baudrate if the data comes back garbled.
+            A buffered display reads from its shadow buffer instead.
+        """
+        if w <= 0 or h <= 0 or self.is_off_grid(x, y, x + w - 1, y + h - 1):
+            raise ValueError('Region must be on screen.')
+        size = w * h * 2
+        if buf is None:
+            buf = bytearray(size)
+        if self._fb is not None:
+            dst = memoryview(buf)
+            fb = self._fb_mv
+            row = w * 2
+            offset = (y * self.width + x) * 2
+            for i in range(0, size, row):
+                dst[i:i + row] = fb[offset:offset + row]
+                offset += self.width * 2
+            return buf
+        raw = self._xfer_buf(1)
+        step = len(raw) // 3 * 3
+        with self:
+            self._write_window(self.SET_COLUMN, x, x + w - 1)
+            self._write_window(self.SET_PAGE, y, y + h - 1)
+            # The page window no longer reaches the bottom of the screen
+            self.invalidate_window()
+            self.write_cmd(self.READ_RAM)
+            self.read_data(raw[:1])
+            o = 0
+            while o < size:
+                n = min(step, (size - o) // 2 * 3)
+                self.read_data(raw[:n])
+                for i in range(0, n, 3):
+                    g = raw[i + 1]
+                    buf[o] = (raw[i] & 0xF8) | g >> 5
+                    buf[o + 1] = (g << 3) & 0xE0 | raw[i + 2] >> 3
+                    o += 2
+        return buf
+
+    def read_data_mpy(self, buf):
+        """Read data from OLED inside a session (MicroPython).
+
+        Args:
+            buf (bytearray): Buffer to fill.
+        """
+        self.dc(1)
+        self.spi.readinto(buf)
+
+    def read_data_cpy(self, buf):
+        """Read data from OLED inside a session (CircuitPython).
+
+        Args:
+            buf (bytearray): Buffer to fill.
+        """
+        self.dc.value = True
+        self.spi.readinto(buf)
+
     def reset_cpy(self):
         """Perform reset: Low=initialization, High=normal operation.
 
         Notes: CircuitPython implemntation
         """
         self.rst.value = False
-        sleep(.05)
+        sleep(.001)
         self.rst.value = True
-        sleep(.05)
+        sleep(self.RESET_DELAY / 1000)
 
     def reset_mpy(self):
         """Perform reset: Low=initialization, High=normal operation.
@@ -871,9 +2589,66 @@ class Display(object):
         Notes: MicroPython implemntation
         """
         self.rst(0)
-        sleep(.05)
+        sleep(.001)
         self.rst(1)
-        sleep(.05)
+        sleep(self.RESET_DELAY / 1000)
+
+    def restore_region(self, region):
+        """Put back a region saved with save_region().
+
+        Args:
+            region (tuple): (x, y, w, h, pixels) from save_region().
+        """
+        x, y, w, h, pixels = region
+        self.block(x, y, x + w - 1, y + h - 1, pixels)
+
+    def save_region(self, x, y, w, h, buf=None):
+        """Save the pixels of a region before drawing over it.
+
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of region.
+            h (int): Height of region.
+            buf (Optional bytearray): Storage of w x h x 2 bytes to reuse.
+        Returns:
+            tuple: (x, y, w, h, pixels) for restore_region().  The region
+                is trimmed to the screen.
+        """
+        clip = self._clip_rect(x, y, w, h)
+        if clip is None:
+            return x, y, 0, 0, b''
+        x, y, w, h = clip
+        return x, y, w, h, self.read_block(x, y, w, h, buf)
+
+    def screenshot(self, path, x=0, y=0, w=None, h=None):
+        """Save the screen, or part of it, to a raw RGB565 file.
+
+        Args:
+            path (string): Output file path.
+            x (int): Starting X position (default: 0).
+            y (int): Starting Y position (default: 0).
+            w (Optional int): Width (default: to the right edge).
+            h (Optional int): Height (default: to the bottom edge).
+        Note:
+            Rows are read and written a band at a time, so the capture
+            needs no more RAM than one transfer buffer.  draw_image() can
+            display the file again.
+        """
+        if w is None:
+            w = self.width - x
+        if h is None:
+            h = self.height - y
+        band = self._xfer_buf(0)
+        rows = max(1, len(band) // (w * 2))
+        with open(path, 'wb') as f:
+            r = y
+            while r < y + h:
+                n = min(rows, y + h - r)
+                pixels = band[:w * n * 2]
+                self.read_block(x, r, w, n, pixels)
+                f.write(pixels)
+                r += n
 
     def scroll(self, y):
         """Scroll display vertically.
@@ -883,6 +2658,19 @@ class Display(object):
         """
         self.write_cmd(self.VSCRSADD, y >> 8, y & 0xFF)
 
+    def session(self):
+        """Hold the bus for a group of drawing calls.
+
+        Returns:
+            Display: Context manager, use as "with display.session():".
+        Note:
+            Inside the block CS stays low and (CircuitPython) the SPI lock
+            is taken once, so commands and data only toggle DC.  Sessions
+            nest.  Do not talk to other devices on the same SPI bus, such
+            as an SD card, until the block ends.
+        """
+        return self
+
     def set_scroll(self, top, bottom):
         """Set the height of the top and bottom scroll margins.
 
@@ -892,7 +2680,6 @@ class Display(object):
         """
         if top + bottom <= self.height:
             middle = self.height - (top + bottom)
-            print(top, middle, bottom)
             self.write_cmd(self.VSCRDEF,
                            top >> 8,
                            top & 0xFF,
@@ -901,6 +2688,39 @@ class Display(object):
                            bottom >> 8,
                            bottom & 0xFF)
 
+    def sprite_runs(self, buf, w, h, key):
+        """Find the opaque runs of a color keyed sprite.
+
+        Args:
+            buf (bytearray): RGB565 sprite pixels.
+            w (int): Width of sprite.
+            h (int): Height of sprite.
+            key (int): RGB565 color that is transparent.
+        Returns:
+            array: Flat (row, x, length) triples, in row order.
+        """
+        hi = key >> 8
+        lo = key & 0xFF
+        runs = array('H')
+        o = 0
+        for ry in range(h):
+            start = -1
+            for rx in range(w):
+                if buf[o] == hi and buf[o + 1] == lo:
+                    if start >= 0:
+                        runs.append(ry)
+                        runs.append(start)
+                        runs.append(rx - start)
+                        start = -1
+                elif start < 0:
+                    start = rx
+                o += 2
+            if start >= 0:
+                runs.append(ry)
+                runs.append(start)
+                runs.append(w - start)
+        return runs
+
     def write_cmd_mpy(self, command, *args):
         """Write command to OLED (MicroPython).
 
@@ -908,13 +2728,14 @@ class Display(object):
             command (byte): ILI9341 command code.
             *args (optional bytes): Data to transmit.
         """
+        self._cmd_buf[0] = command
         self.dc(0)
         self.cs(0)
-        self.spi.write(bytearray([command]))
+        self.spi.write(self._cmd_buf)
         self.cs(1)
         # Handle any passed data
         if len(args) > 0:
-            self.write_data(bytearray(args))
+            self.write_data(self._pack_args(args))
 
     def write_cmd_cpy(self, command, *args):
         """Write command to OLED (CircuitPython).
@@ -923,17 +2744,46 @@ class Display(object):
             command (byte): ILI9341 command code.
             *args (optional bytes): Data to transmit.
         """
+        self._cmd_buf[0] = command
         self.dc.value = False
         self.cs.value = False
         # Confirm SPI locked before writing
         while not self.spi.try_lock():
             pass
-        self.spi.write(bytearray([command]))
+        self.spi.write(self._cmd_buf)
         self.spi.unlock()
         self.cs.value = True
         # Handle any passed data
         if len(args) > 0:
-            self.write_data(bytearray(args))
+            self.write_data(self._pack_args(args))
+
+    def write_cmd_mpy_held(self, command, *args):
+        """Write command inside a session, CS already low (MicroPython).
+
+        Args:
+            command (byte): ILI9341 command code.
+            *args (optional bytes): Data to transmit.
+        """
+        self._cmd_buf[0] = command
+        self.dc(0)
+        self.spi.write(self._cmd_buf)
+        if len(args) > 0:
+            self.dc(1)
+            self.spi.write(self._pack_args(args))
+
+    def write_cmd_cpy_held(self, command, *args):
+        """Write command inside a session, bus locked (CircuitPython).
+
+        Args:
+            command (byte): ILI9341 command code.
+            *args (optional bytes): Data to transmit.
+        """
+        self._cmd_buf[0] = command
+        self.dc.value = False
+        self.spi.write(self._cmd_buf)
+        if len(args) > 0:
+            self.dc.value = True
+            self.spi.write(self._pack_args(args))
 
     def write_data_mpy(self, data):
         """Write data to OLED (MicroPython).
@@ -960,7 +2810,25 @@ class Display(object):
         self.spi.write(data)
         self.spi.unlock()
         self.cs.value = True
-        
+
+    def write_data_mpy_held(self, data):
+        """Write data inside a session, CS already low (MicroPython).
+
+        Args:
+            data (bytes): Data to transmit.
+        """
+        self.dc(1)
+        self.spi.write(data)
+
+    def write_data_cpy_held(self, data):
+        """Write data inside a session, bus locked (CircuitPython).
+
+        Args:
+            data (bytes): Data to transmit.
+        """
+        self.dc.value = True
+        self.spi.write(data)
+
 
 class TouchKey:  
   def __init__(self, i2c, irq, addr = 0x38):
@@ -993,23 +2861,24 @@ class TouchKey:
     s = self.read_reg(b'\2')
     return (s & 0x0f)
   
-from machine import Pin, SPI
-
-spi = SPI(1, sck=Pin(18), mosi=Pin(23), miso=Pin(19))
-ssd = Display(spi, cs=Pin(14), dc=Pin(27), rst=Pin(33), rotation=180)
-ssd.fill_ellipse(160, 120, 40, 40, color565(255, 255, 255))
-i2c = SoftI2C(scl=Pin(22), sda=Pin(21))
-t = TouchKey(i2c=i2c, irq=Pin(37))
-
-Pin(32, Pin.OUT).value(1)
-ssd.fill_ellipse(160, 120, 40, 40, color565(255, 255, 255))
-
-while True:
-  s = t.touchPos()
-  if s == (300, 400): #3
-    ssd.fill_ellipse(160, 120, 40, 40, color565(255, 255, 0))
-  elif s == (60, 400):
-    ssd.fill_ellipse(160, 120, 40, 40, color565(255, 0, 255))
-  elif s == (180, 400):
-    ssd.fill_ellipse(160, 120, 40, 40, color565(0, 255, 255))
-  sleep(0.5)
\ No newline at end of file
+if __name__ == '__main__':
+    from machine import Pin, SPI
+
+    spi = SPI(1, sck=Pin(18), mosi=Pin(23), miso=Pin(19))
+    ssd = Display(spi, cs=Pin(14), dc=Pin(27), rst=Pin(33), rotation=180)
+    ssd.fill_ellipse(160, 120, 40, 40, color565(255, 255, 255))
+    i2c = SoftI2C(scl=Pin(22), sda=Pin(21))
+    t = TouchKey(i2c=i2c, irq=Pin(37))
+
+    Pin(32, Pin.OUT).value(1)
+    ssd.fill_ellipse(160, 120, 40, 40, color565(255, 255, 255))
+
+    while True:
+      s = t.touchPos()
+      if s == (300, 400): #3
+        ssd.fill_ellipse(160, 120, 40, 40, color565(255, 255, 0))
+      elif s == (60, 400):
+        ssd.fill_ellipse(160, 120, 40, 40, color565(255, 0, 255))
+      elif s == (180, 400):
+        ssd.fill_ellipse(160, 120, 40, 40, color565(0, 255, 255))
+      sleep(0.5)
@@ -0,0 +1,141 @@
+"""Off-screen drawing targets for the ILI9341 Display class."""
+
+
+class Canvas(object):
+    """Base class for objects that accept the same drawing calls as Display.
+
+    Shapes, lines, text and images are rasterized by the Display methods
+    themselves.  They all end in either a solid rectangle or a pixel blit,
+    so a canvas only has to implement those two sinks:
+
+        _fill(x, y, w, h, color)
+        _blit(x, y, w, h, data)
+
+    Any other Display method is looked up on the display class and run
+    against the canvas, so its output lands in the canvas instead of the
+    panel.  Bus sessions (with canvas.session():) are accepted and do
+    nothing.
+
+    Note:  All coordinates are zero based.
+    """
+
+    def __init__(self, display, width=None, height=None):
+        """Initialize canvas.
+
+        Args:
+            display (Display): Display whose drawing methods are borrowed.
+            width (Optional int): Canvas width (default: display width)
+            height (Optional int): Canvas height (default: display height)
+        """
+        self.display = display
+        self.width = display.width if width is None else width
+        self.height = display.height if height is None else height
+
+    def __getattr__(self, name):
+        func = getattr(type(self.display), name, None)
+        if func is None or not callable(func):
+            return getattr(self.display, name)
+
+        def method(*args, **kwargs):
+            return func(self, *args, **kwargs)
+        return method
+
+    def __enter__(self):
+        # Bus sessions mean nothing off-screen, accept them as no-ops
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def _fill(self, x, y, w, h, color):
+        raise NotImplementedError
+
+    def _fill_block(self, x, y, w, h, color):
+        # Display methods that fill an already clipped area call this
+        self._fill(x, y, w, h, color)
+
+    def _blit(self, x, y, w, h, data):
+        raise NotImplementedError
+
+    def block(self, x0, y0, x1, y1, data):
+        """Write a block of data to the canvas.
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            y1 (int):  Ending Y position.
+            data (bytes): Data buffer to write.
+        """
+        self._blit(x0, y0, x1 - x0 + 1, y1 - y0 + 1, data)
+
+    def clear(self, color=0):
+        """Clear canvas.
+
+        Args:
+            color (Optional int): RGB565 color value (Default: 0 = Black).
+        """
+        self._fill(0, 0, self.width, self.height, color)
+
+    def draw_hline(self, x, y, w, color):
+        """Draw a horizontal line.
+
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of line.
+            color (int): RGB565 color value.
+        """
+        self.fill_hrect(x, y, w, 1, color)
+
+    def draw_pixel(self, x, y, color):
+        """Draw a single pixel.
+
+        Args:
+            x (int): X position.
+            y (int): Y position.
+            color (int): RGB565 color value.
+        """
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self._fill(x, y, 1, 1, color)
+
+    def draw_vline(self, x, y, h, color):
+        """Draw a vertical line.
+
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            h (int): Height of line.
+            color (int): RGB565 color value.
+        """
+        self.fill_hrect(x, y, 1, h, color)
+
+    def fill_hrect(self, x, y, w, h, color):
+        """Draw a filled rectangle, clipped to the canvas.
+
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of rectangle.
+            h (int): Height of rectangle.
+            color (int): RGB565 color value.
+        """
+        if x < 0:
+            w += x
+            x = 0
+        if y < 0:
+            h += y
+            y = 0
+        if x + w > self.width:
+            w = self.width - x
+        if y + h > self.height:
+            h = self.height - y
+        if w > 0 and h > 0:
+            self._fill(x, y, w, h, color)
+
+    fill_rectangle = fill_hrect
+    fill_vrect = fill_hrect
+
+    def flush(self):
+        """Nothing to flush, canvases have no panel of their own."""
+        pass
@@ -0,0 +1,131 @@
+"""Scrolling text console for the ILI9341 Display class."""
+
+
+class Console(object):
+    """Text terminal that scrolls with the panel's vertical scroll pointer.
+
+    Lines are written into the panel RAM where the oldest line was and the
+    scroll start address is moved by one line, so appending a line costs
+    one line of pixels instead of redrawing the screen.  Rows above top
+    and below bottom do not scroll and can hold a header and footer.
+
+    The scrolling area is rounded down to a whole number of lines, the
+    spare rows are added to the bottom margin (see the bottom attribute).
+
+    Example:
+        console = Console(display, font, top=20, bottom=20)
+        display.draw_text(0, 4, 'Log', font, color565(255, 255, 0))
+        console.write('boot ok\\n')
+        console.write('{0} files\\n'.format(n))
+    """
+
+    def __init__(self, display, font, top=0, bottom=0, color=0xFFFF,
+                 background=0, spacing=1, line_spacing=0):
+        """Initialize console and claim the scrolling area.
+
+        Args:
+            display (Display): Display to draw on.
+            font (XglcdFont object): Font.
+            top (int): Height of the fixed top margin (default: 0).
+            bottom (int): Height of the fixed bottom margin (default: 0).
+            color (int): RGB565 text color (default: white).
+            background (int): RGB565 background color (default: black).
+            spacing (int): Pixels between letters (default: 1)
+            line_spacing (int): Pixels between lines (default: 0)
+        """
+        self.display = display
+        self.font = font
+        self.color = color
+        self.background = background
+        self.spacing = spacing
+        self.line_height = font.height + line_spacing
+        self.rows = (display.height - top - bottom) // self.line_height
+        if self.rows < 1:
+            raise ValueError('No room for a line between the margins.')
+        self.top = top
+        self.area = self.rows * self.line_height
+        self.bottom = display.height - top - self.area
+        display.set_scroll(self.top, self.bottom)
+        self.clear()
+
+    def clear(self):
+        """Clear the scrolling area and return the cursor to the top."""
+        self.display.fill_hrect(0, self.top, self.display.width, self.area,
+                                self.background)
+        # Scroll offset of the first visible line within the area
+        self._offset = 0
+        self.display.scroll(self.top)
+        self.row = 0
+        self.column = 0
+
+    def close(self):
+        """Give the whole screen back to normal drawing."""
+        self.display.set_scroll(0, 0)
+        self.display.scroll(0)
+
+    def _line_y(self, row):
+        """Return the panel RAM row of a visible line.
+
+        Args:
+            row (int): Visible line, 0 is the top one.
+        Returns:
+            int: Y position to draw the line at.
+        """
+        return self.top + (self._offset + row * self.line_height) % self.area
+
+    def newline(self):
+        """Move the cursor to the start of the next line, scrolling if needed.
+        """
+        self.column = 0
+        if self.row < self.rows - 1:
+            self.row += 1
+            return
+        # The top line scrolls out and its RAM becomes the new bottom line
+        y = self._line_y(0)
+        self._offset = (self._offset + self.line_height) % self.area
+        self.display.fill_hrect(0, y, self.display.width, self.line_height,
+                                self.background)
+        self.display.scroll(self.top + self._offset)
+
+    def _draw(self, text):
+        if text:
+            self.display.draw_text(self.column, self._line_y(self.row), text,
+                                   self.font, self.color, self.background,
+                                   spacing=self.spacing)
+            self.column += self.font.measure_text(text, self.spacing)
+
+    def write(self, text):
+        """Append text, wrapping at the screen edge.
+
+        Args:
+            text (string): Text to append, newlines start a new line.
+        """
+        width = self.display.width
+        font = self.font
+        spacing = self.spacing
+        start = 0
+        column = self.column
+        for i in range(len(text)):
+            letter = text[i]
+            if letter == '\n':
+                self._draw(text[start:i])
+                self.newline()
+                start = i + 1
+                column = 0
+                continue
+            w = font.measure_text(letter, spacing)
+            if column + w > width + spacing and column:
+                self._draw(text[start:i])
+                self.newline()
+                start = i
+                column = 0
+            column += w
+        self._draw(text[start:])
+
+    def print(self, *args):
+        """Write values separated by spaces and end the line, like print().
+
+        Args:
+            *args: Values to write.
+        """
+        self.write(' '.join(str(a) for a in args) + '\n')
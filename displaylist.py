@@ -0,0 +1,113 @@
+"""Retained display list for the ILI9341 Display class."""
+from micropython import const
+from canvas import Canvas
+
+FILL = const(0)  # Solid rectangle, payload is an RGB565 color
+BLIT = const(1)  # Pixel block, payload is RGB565 bytes
+
+
+class DisplayList(Canvas):
+    """Record drawing calls once and replay them many times.
+
+    Every call is reduced to solid rectangles and pixel blits.  While
+    recording, same-colored rectangles that line up are merged, and
+    optimize() drops operations that are completely painted over later.
+
+    Each entry of ops is a list [kind, x, y, w, h, payload].
+
+    Example:
+        scene = DisplayList(display)
+        scene.clear()
+        scene.fill_ellipse(160, 120, 40, 40, color565(255, 255, 255))
+        scene.draw_text(10, 10, 'Ready', font, color565(0, 255, 0))
+        scene.replay()
+    """
+
+    # Number of earlier operations searched for a merge partner
+    MERGE_DEPTH = const(8)
+
+    def __init__(self, display):
+        """Initialize display list.
+
+        Args:
+            display (Display): Display to replay on by default.
+        """
+        super().__init__(display)
+        self.ops = []
+        self.recorded = 0
+        self._optimized = True
+
+    def reset(self):
+        """Discard all recorded operations."""
+        self.ops = []
+        self.recorded = 0
+        self._optimized = True
+
+    def _fill(self, x, y, w, h, color):
+        self.recorded += 1
+        self._optimized = False
+        ops = self.ops
+        x2 = x + w
+        y2 = y + h
+        stop = max(-1, len(ops) - 1 - self.MERGE_DEPTH)
+        for i in range(len(ops) - 1, stop, -1):
+            op = ops[i]
+            ox, oy, ow, oh = op[1], op[2], op[3], op[4]
+            if op[0] == FILL and op[5] == color:
+                # Side by side with the same rows
+                if oy == y and oh == h and x <= ox + ow and x2 >= ox:
+                    op[1] = min(x, ox)
+                    op[3] = max(x2, ox + ow) - op[1]
+                    return
+                # Stacked with the same columns
+                if ox == x and ow == w and y <= oy + oh and y2 >= oy:
+                    op[2] = min(y, oy)
+                    op[4] = max(y2, oy + oh) - op[2]
+                    return
+            # Cannot move the new rectangle behind something it overlaps
+            if x < ox + ow and x2 > ox and y < oy + oh and y2 > oy:
+                break
+        ops.append([FILL, x, y, w, h, color])
+
+    def _blit(self, x, y, w, h, data):
+        self.recorded += 1
+        self._optimized = False
+        # Callers reuse their buffers, so keep a private copy
+        self.ops.append([BLIT, x, y, w, h, bytes(data[:w * h * 2])])
+
+    def optimize(self):
+        """Drop operations that are fully covered by later ones.
+
+        Returns:
+            int: Number of operations left.
+        """
+        kept = []
+        for op in reversed(self.ops):
+            x, y, x2, y2 = op[1], op[2], op[1] + op[3], op[2] + op[4]
+            for c in kept:
+                if (c[1] <= x and c[2] <= y and
+                        c[1] + c[3] >= x2 and c[2] + c[4] >= y2):
+                    break
+            else:
+                kept.append(op)
+        kept.reverse()
+        self.ops = kept
+        self._optimized = True
+        return len(kept)
+
+    def replay(self, display=None):
+        """Draw the recorded operations.
+
+        Args:
+            display (Optional Display): Target (default: recording display)
+        """
+        if not self._optimized:
+            self.optimize()
+        target = self.display if display is None else display
+        fill = target.fill_hrect
+        block = target.block
+        for kind, x, y, w, h, payload in self.ops:
+            if kind == FILL:
+                fill(x, y, w, h, payload)
+            else:
+                block(x, y, x + w - 1, y + h - 1, payload)
@@ -0,0 +1,248 @@
+"""Indexed color frame buffer for the ILI9341 Display class."""
+from micropython import const
+from canvas import Canvas
+
+# 16 color default palette for 4 bits per pixel (RGB565)
+PALETTE_16 = (0x0000, 0xFFFF, 0xF800, 0x07E0, 0x001F, 0xFFE0, 0x07FF,
+              0xF81F, 0x8410, 0xC618, 0x4208, 0x8000, 0x0400, 0x0010,
+              0xFC00, 0x8010)
+
+
+def rgb332_palette():
+    """Return the 256 color 3-3-2 palette used by default at 8 bpp."""
+    palette = []
+    for i in range(256):
+        r = (i >> 5) * 255 // 7
+        g = ((i >> 2) & 7) * 255 // 7
+        b = (i & 3) * 255 // 3
+        palette.append((r & 0xF8) << 8 | (g & 0xFC) << 3 | b >> 3)
+    return palette
+
+
+class IndexedFrameBuffer(Canvas):
+    """Off-screen frame in 4 or 8 bits per pixel, expanded on flush().
+
+    A full 320x240 frame takes 38400 bytes at 4 bpp or 76800 bytes at
+    8 bpp instead of 153600 for RGB565.  Drawing calls take RGB565 colors
+    as usual, each is mapped to the closest palette entry.  flush() turns
+    the changed rows back into RGB565 through a lookup table, a few rows at
+    a time in one reusable line buffer, and writes them to the display.
+
+    Example:
+        frame = IndexedFrameBuffer(display, bpp=4)
+        frame.clear(color565(0, 0, 128))
+        frame.draw_text(10, 10, 'Ready', font, color565(255, 255, 255),
+                        color565(0, 0, 128))
+        frame.flush()
+    """
+
+    # Colors remembered before the color to index map is reset
+    MAX_COLORS = const(256)
+
+    def __init__(self, display, bpp=4, palette=None, width=None,
+                 height=None):
+        """Initialize frame buffer.
+
+        Args:
+            display (Display): Display to flush to.
+            bpp (Optional int): 4 or 8 bits per pixel (default: 4).
+            palette (Optional list): RGB565 colors, at most 2 ** bpp
+                (default: PALETTE_16 at 4 bpp, 3-3-2 RGB at 8 bpp).
+            width (Optional int): Width (default: display width).
+            height (Optional int): Height (default: display height).
+        """
+        super().__init__(display, width, height)
+        if bpp not in (4, 8):
+            raise ValueError('Bits per pixel must be 4 or 8.')
+        if bpp == 4 and self.width & 1:
+            raise ValueError('Width must be even at 4 bits per pixel.')
+        self.bpp = bpp
+        self.stride = self.width * bpp // 8
+        self.buffer = bytearray(self.stride * self.height)
+        self._mv = memoryview(self.buffer)
+        if palette is None:
+            palette = PALETTE_16 if bpp == 4 else rgb332_palette()
+        if len(palette) > 1 << bpp:
+            raise ValueError('Palette has more than {0} colors.'.format(
+                1 << bpp))
+        self.palette = list(palette)
+        # Lookup tables: high and low RGB565 byte per index (8 bpp) or
+        # the 4 bytes of both pixels per packed byte (4 bpp)
+        self._lut = bytearray(1024 if bpp == 4 else 512)
+        self._build_lut()
+        self._colors = {}
+        self._row = bytearray(self.width)
+        self._row_value = -1
+        rows = max(1, display.chunk_size // (self.width * 2))
+        self._line = bytearray(self.width * 2 * min(rows, self.height))
+        self._dirty = None
+
+    def _build_lut(self):
+        """Rebuild the palette to RGB565 lookup table."""
+        palette = self.palette
+        n = len(palette)
+        lut = self._lut
+        if self.bpp == 8:
+            for i in range(n):
+                lut[i] = palette[i] >> 8
+                lut[256 + i] = palette[i] & 0xFF
+            return
+        for b in range(256):
+            left = palette[b >> 4] if b >> 4 < n else 0
+            right = palette[b & 15] if b & 15 < n else 0
+            o = b * 4
+            lut[o] = left >> 8
+            lut[o + 1] = left & 0xFF
+            lut[o + 2] = right >> 8
+            lut[o + 3] = right & 0xFF
+
+    def set_palette(self, index, color):
+        """Change one palette entry, existing pixels change with it.
+
+        Args:
+            index (int): Palette index.
+            color (int): RGB565 color value.
+        """
+        while len(self.palette) <= index:
+            self.palette.append(0)
+        self.palette[index] = color
+        self._build_lut()
+        self._colors = {}
+        self._dirty = (0, 0, self.width - 1, self.height - 1)
+
+    def index_of(self, color):
+        """Return the palette index used for an RGB565 color.
+
+        Args:
+            color (int): RGB565 color value.
+        Returns:
+            int: Index of the closest palette color.
+        """
+        index = self._colors.get(color)
+        if index is not None:
+            return index
+        r = color >> 11
+        g = (color >> 5) & 0x3F
+        b = color & 0x1F
+        best = None
+        for i, c in enumerate(self.palette):
+            # Green has one more bit, halve it to weigh channels alike
+            dr = (c >> 11) - r
+            dg = (((c >> 5) & 0x3F) - g) >> 1
+            db = (c & 0x1F) - b
+            d = dr * dr + dg * dg + db * db
+            if best is None or d < best:
+                best = d
+                index = i
+                if d == 0:
+                    break
+        if len(self._colors) >= self.MAX_COLORS:
+            self._colors = {}
+        self._colors[color] = index
+        return index
+
+    def _mark(self, x0, y0, x1, y1):
+        dirty = self._dirty
+        if dirty is None:
+            self._dirty = (x0, y0, x1, y1)
+        else:
+            self._dirty = (min(x0, dirty[0]), min(y0, dirty[1]),
+                           max(x1, dirty[2]), max(y1, dirty[3]))
+
+    def _fill(self, x, y, w, h, color):
+        index = self.index_of(color)
+        value = index if self.bpp == 8 else index * 17
+        if value != self._row_value:
+            row = self._row
+            for i in range(len(row)):
+                row[i] = value
+            self._row_value = value
+        buf = self._mv
+        row = memoryview(self._row)
+        stride = self.stride
+        if self.bpp == 8:
+            for r in range(y, y + h):
+                o = r * stride + x
+                buf[o:o + w] = row[:w]
+        else:
+            x1 = x + w
+            # Whole bytes in the middle, single nibbles at odd edges
+            first = (x + 1) >> 1
+            last = x1 >> 1
+            for r in range(y, y + h):
+                o = r * stride
+                if x & 1:
+                    buf[o + (x >> 1)] = (buf[o + (x >> 1)] & 0xF0) | index
+                if last > first:
+                    buf[o + first:o + last] = row[:last - first]
+                if x1 & 1 and (x1 >> 1) >= first:
+                    buf[o + last] = (buf[o + last] & 0x0F) | (index << 4)
+        self._mark(x, y, x + w - 1, y + h - 1)
+
+    def _blit(self, x, y, w, h, data):
+        buf = self.buffer
+        stride = self.stride
+        index_of = self.index_of
+        last = -1
+        index = 0
+        i = 0
+        for r in range(y, y + h):
+            o = r * stride
+            for c in range(x, x + w):
+                color = data[i] << 8 | data[i + 1]
+                i += 2
+                if color != last:
+                    index = index_of(color)
+                    last = color
+                if self.bpp == 8:
+                    buf[o + c] = index
+                elif c & 1:
+                    buf[o + (c >> 1)] = (buf[o + (c >> 1)] & 0xF0) | index
+                else:
+                    buf[o + (c >> 1)] = (buf[o + (c >> 1)] & 0x0F) | (
+                        index << 4)
+        self._mark(x, y, x + w - 1, y + h - 1)
+
+    def flush(self):
+        """Expand the changed area to RGB565 and write it to the display."""
+        if self._dirty is None:
+            return
+        x0, y0, x1, y1 = self._dirty
+        self._dirty = None
+        if self.bpp == 4:
+            # Expand whole bytes
+            x0 &= ~1
+            x1 |= 1
+        n = x1 - x0 + 1
+        row = n * 2
+        rows = len(self._line) // row
+        line = self._line
+        out = memoryview(line)
+        lut = self._lut
+        # Row slices of a memoryview, not copies of the bytearray
+        src = self._mv
+        stride = self.stride
+        display = self.display
+        y = y0
+        with display:
+            while y <= y1:
+                k = min(rows, y1 - y + 1)
+                o = 0
+                for r in range(y, y + k):
+                    if self.bpp == 8:
+                        s = r * stride + x0
+                        for v in src[s:s + n]:
+                            line[o] = lut[v]
+                            line[o + 1] = lut[256 + v]
+                            o += 2
+                    else:
+                        s = r * stride + (x0 >> 1)
+                        for v in src[s:s + (n >> 1)]:
+                            p = v * 4
+                            line[o] = lut[p]
+                            line[o + 1] = lut[p + 1]
+                            line[o + 2] = lut[p + 2]
+                            line[o + 3] = lut[p + 3]
+                            o += 4
+                display.block(x0, y, x1, y + k - 1, out[:k * row])
+                y += k
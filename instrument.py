@@ -0,0 +1,275 @@
+"""Opt-in call statistics for the Display, SDCard and MPU6886 bus layers."""
+from array import array
+from micropython import const
+try:
+    from time import ticks_us, ticks_diff
+except ImportError:
+    from time import monotonic
+
+    def ticks_us():
+        return int(monotonic() * 1000000)
+
+    def ticks_diff(a, b):
+        return a - b
+
+# Latency histogram buckets: 0 us, 1 us, 2-3 us, 4-7 us ... >= 2**14 us
+BUCKETS = const(16)
+
+
+def _command_size(args):
+    # write_cmd_*_held(command, *args): the command byte and its parameters
+    return len(args)
+
+
+def _last_len(args):
+    # write_data(data), block(x0, y0, x1, y1, data), readblocks(n, buf)
+    return len(args[-1])
+
+
+def _fill_size(args):
+    # _fill_block(x, y, w, h, color): RGB565 pixels of the area
+    return args[2] * args[3] * 2
+
+
+# Methods wrapped per class name: (attribute, name in the stats, size).
+# Size is a byte count or a function of the positional arguments.
+# The held variants are what Display switches to inside a bus session,
+# they are recorded under the same names as write_cmd and write_data.
+# Outside a session write_cmd passes its parameters on to write_data, so
+# only the command byte is counted for it, the held variant writes its
+# parameters itself.
+# block counts blits requested by callers only, solid fills go through
+# _fill_block and every panel RAM write (blits, fills, flushes) starts
+# with _begin_write.
+TARGETS = {
+    'Display': (
+        ('write_cmd', 'write_cmd', 1),
+        ('write_cmd_mpy_held', 'write_cmd', _command_size),
+        ('write_cmd_cpy_held', 'write_cmd', _command_size),
+        ('write_data', 'write_data', _last_len),
+        ('write_data_mpy_held', 'write_data', _last_len),
+        ('write_data_cpy_held', 'write_data', _last_len),
+        ('block', 'block', _last_len),
+        ('_write_block', '_write_block', _last_len),
+        ('_fill_block', '_fill_block', _fill_size),
+        ('_begin_write', '_begin_write', 0),
+    ),
+    'SDCard': (
+        ('send_cmd', 'send_cmd', 6),
+        ('readblocks', 'readblocks', _last_len),
+        ('writeblocks', 'writeblocks', _last_len),
+    ),
+    'MPU6886': (
+        ('_register_char', '_register_char', 1),
+        ('_register_short', '_register_short', 2),
+        ('_register_three_shorts', '_register_three_shorts', 6),
+    ),
+}
+
+
+class Record(object):
+    """Counters of one instrumented method."""
+
+    def __init__(self, name):
+        self.name = name
+        self.reset()
+
+    def reset(self):
+        """Zero the counters."""
+        self.count = 0
+        self.bytes = 0
+        self.total_us = 0
+        self.max_us = 0
+        self.histogram = array('L', [0] * BUCKETS)
+
+    def add(self, us, n):
+        """Account one call.
+
+        Args:
+            us (int): Duration in microseconds.
+            n (int): Bytes moved.
+        """
+        self.count += 1
+        self.bytes += n
+        self.total_us += us
+        if us > self.max_us:
+            self.max_us = us
+        bucket = 0
+        while us and bucket < BUCKETS - 1:
+            us >>= 1
+            bucket += 1
+        self.histogram[bucket] += 1
+
+    def mean_us(self):
+        """Return the mean duration in microseconds."""
+        return self.total_us / self.count if self.count else 0
+
+    def as_dict(self):
+        """Return the counters as a dict."""
+        return {'count': self.count, 'bytes': self.bytes,
+                'total_us': self.total_us, 'max_us': self.max_us,
+                'histogram': list(self.histogram)}
+
+
+class Stats(object):
+    """Records of all instrumented methods, by name.
+
+    Example:
+        stats['block'].count
+        stats.top(3)
+        stats.dump('/sd/stats.txt')
+    """
+
+    def __init__(self):
+        self.records = {}
+
+    def record(self, name):
+        """Return the record for a name, creating it if needed."""
+        record = self.records.get(name)
+        if record is None:
+            record = self.records[name] = Record(name)
+        return record
+
+    def __getitem__(self, name):
+        return self.records[name]
+
+    def __contains__(self, name):
+        return name in self.records
+
+    def names(self):
+        """Return the recorded names, sorted."""
+        return sorted(self.records)
+
+    def reset(self):
+        """Zero every record."""
+        for record in self.records.values():
+            record.reset()
+
+    def top(self, n=5, key='total_us'):
+        """Return the records with the largest value of a counter.
+
+        Args:
+            n (int): Number of records (default: 5).
+            key (string): 'total_us', 'count', 'bytes' or 'max_us'.
+        Returns:
+            list: Records, largest first.
+        """
+        records = sorted(self.records.values(),
+                         key=lambda r: getattr(r, key), reverse=True)
+        return records[:n]
+
+    def as_dict(self):
+        """Return all counters as a dict of dicts."""
+        return dict((name, r.as_dict()) for name, r in self.records.items())
+
+    def dump(self, out=None):
+        """Print a table of all records.
+
+        Args:
+            out (Optional string or stream): File path or object with a
+                write() method (default: print to the REPL).
+        """
+        lines = ['{0:<24}{1:>9}{2:>11}{3:>11}{4:>9}{5:>9}'.format(
+            'method', 'calls', 'bytes', 'total us', 'mean us', 'max us')]
+        for record in self.top(len(self.records)):
+            lines.append('{0:<24}{1:>9}{2:>11}{3:>11}{4:>9}{5:>9}'.format(
+                record.name, record.count, record.bytes, record.total_us,
+                int(record.mean_us()), record.max_us))
+            # Upper bound of each non-empty bucket and its call count
+            hist = ['<{0}:{1}'.format(1 << i, c)
+                    for i, c in enumerate(record.histogram) if c]
+            lines.append('    us ' + ' '.join(hist))
+        text = '\n'.join(lines) + '\n'
+        if out is None:
+            print(text, end='')
+        elif isinstance(out, str):
+            with open(out, 'w') as f:
+                f.write(text)
+        else:
+            out.write(text)
+
+
+class Instrument(object):
+    """Wraps bus methods of driver instances to collect Stats.
+
+    Nothing is wrapped until attach() is called and detach() puts the
+    original methods back, so drivers run at full speed when not being
+    measured.  Only the given instances are affected, not their classes.
+
+    Example:
+        probe = Instrument()
+        probe.attach(display)
+        probe.attach(sd)
+        probe.attach(imu)
+        run_app()
+        probe.stats.dump()
+        probe.detach()
+
+    Note:
+        Attach and detach a Display outside of a bus session (with
+        display:), the session swaps write_cmd and write_data.
+    """
+
+    def __init__(self):
+        self.stats = Stats()
+        # (instance, attribute, original, was set on the instance)
+        self._wrapped = []
+
+    def attach(self, obj, methods=None):
+        """Start recording the bus methods of an instance.
+
+        Args:
+            obj (object): Display, SDCard or MPU6886 instance.
+            methods (Optional tuple): (attribute, stats name, size) entries
+                (default: TARGETS entry for the class name).
+        """
+        if methods is None:
+            methods = TARGETS.get(type(obj).__name__)
+            if methods is None:
+                raise ValueError('No methods known for {0}.'.format(
+                    type(obj).__name__))
+        own = getattr(obj, '__dict__', {})
+        for attr, name, size in methods:
+            func = getattr(obj, attr, None)
+            if func is None:
+                continue
+            self._wrapped.append((obj, attr, func, attr in own))
+            setattr(obj, attr, self._wrap(func, self.stats.record(name),
+                                          size))
+
+    def detach(self):
+        """Put all original methods back."""
+        while self._wrapped:
+            obj, attr, func, was_own = self._wrapped.pop()
+            if was_own:
+                setattr(obj, attr, func)
+            else:
+                delattr(obj, attr)
+
+    def _wrap(self, func, record, size):
+        """Return func timed and counted into record.
+
+        Args:
+            func (function): Bound method.
+            record (Record): Where calls are counted.
+            size (int or function): Bytes per call or function of the
+                positional arguments returning them.
+        Returns:
+            function: Wrapper.
+        """
+        add = record.add
+        if callable(size):
+            def wrapper(*args, **kwargs):
+                start = ticks_us()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    add(ticks_diff(ticks_us(), start), size(args))
+        else:
+            def wrapper(*args, **kwargs):
+                start = ticks_us()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    add(ticks_diff(ticks_us(), start), size)
+        return wrapper
@@ -0,0 +1,274 @@
+"""Sprite sheets and moving sprites for the ILI9341 Display class."""
+
+
+class SpriteSheet(object):
+    """Equally sized RGB565 frames loaded from one file.
+
+    The file is read once, frames are memoryview slices of it so handing
+    them out never copies.  Frames are stored one after another, each w x h
+    pixels row by row (the raw format of Display.load_sprite()).
+
+    Example:
+        sheet = SpriteSheet('needle.raw', 32, 32)
+        display.draw_sprite(sheet[3], 100, 100, 32, 32)
+    """
+
+    def __init__(self, path, w, h, count=None):
+        """Load sprite sheet.
+
+        Args:
+            path (string): Raw RGB565 file.
+            w (int): Width of a frame.
+            h (int): Height of a frame.
+            count (Optional int): Number of frames (default: as many as the
+                file holds).
+        """
+        self.width = w
+        self.height = h
+        self.frame_size = w * h * 2
+        with open(path, 'rb') as f:
+            if count is None:
+                self.data = bytearray(f.read())
+            else:
+                self.data = bytearray(count * self.frame_size)
+                f.readinto(self.data)
+        self._mv = memoryview(self.data)
+        self.count = len(self.data) // self.frame_size
+        # Opaque run tables per (frame, key), built on first use
+        self._runs = {}
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError('Frame {0} out of range.'.format(i))
+        start = i * self.frame_size
+        return self._mv[start:start + self.frame_size]
+
+    def runs(self, display, i, key):
+        """Return the opaque runs of a frame for a transparent color.
+
+        Args:
+            display (Display): Display used to scan the frame.
+            i (int): Frame index.
+            key (int): RGB565 transparent color.
+        Returns:
+            array: Flat (row, x, length) triples, see Display.sprite_runs().
+        """
+        runs = self._runs.get((i, key))
+        if runs is None:
+            runs = display.sprite_runs(self[i], self.width, self.height, key)
+            self._runs[(i, key)] = runs
+        return runs
+
+
+class Sprite(object):
+    """A sprite that can be moved and animated without redrawing the screen.
+
+    Each draw sends one w x h block with the sprite composed over its
+    background, plus the strips of the previous position that it no longer
+    covers.  The background comes from one of:
+
+        int       A solid RGB565 color.
+        callable  background(x, y, w, h, buf) fills buf with the RGB565
+                  pixels of that screen area, e.g. from a gauge face image.
+        None      Read back from the display (or its frame buffer when
+                  buffered) before drawing and put back when the sprite
+                  moves away.
+
+    Example:
+        needle = Sprite(display, SpriteSheet('needle.raw', 32, 32),
+                        key=color565(255, 0, 255), background=0)
+        for i in range(60):
+            needle.draw(100 + i, 100, i % len(needle.sheet))
+    """
+
+    def __init__(self, display, sheet, key=None, background=None):
+        """Initialize sprite.
+
+        Args:
+            display (Display): Display to draw on.
+            sheet (SpriteSheet): Frames.
+            key (Optional int): RGB565 transparent color (default: opaque)
+            background (Optional int or callable): See class docstring.
+        """
+        self.display = display
+        self.sheet = sheet
+        self.key = key
+        self.background = background
+        self.width = sheet.width
+        self.height = sheet.height
+        size = sheet.frame_size
+        self._comp = bytearray(size)
+        self._next = bytearray(size) if background is None else None
+        self._saved = bytearray(size) if background is None else None
+        self.x = self.y = None
+        self.frame = 0
+
+    def _fetch(self, x, y, buf):
+        """Fill buf with the background under a sprite sized area.
+
+        Args:
+            x (int): Left of the area.
+            y (int): Top of the area.
+            buf (bytearray): Destination, w x h RGB565.
+        """
+        w = self.width
+        h = self.height
+        background = self.background
+        if background is None:
+            self._fetch_saved(x, y, buf)
+        elif callable(background):
+            background(x, y, w, h, buf)
+        else:
+            dst = memoryview(buf)
+            size = len(buf)
+            pattern = self.display._fill_pattern(background, size)
+            n = min(size, len(pattern))
+            dst[:n] = pattern[:n]
+            # Frames larger than chunk_size: double the filled part
+            while n < size:
+                m = min(n, size - n)
+                dst[n:n + m] = dst[:m]
+                n += m
+
+    def _fetch_saved(self, x, y, buf):
+        """Read the screen under an area, patching in saved pixels.
+
+        Args:
+            x (int): Left of the area.
+            y (int): Top of the area.
+            buf (bytearray): Destination, w x h RGB565.
+        """
+        display = self.display
+        w = self.width
+        h = self.height
+        x0 = max(x, 0)
+        x1 = min(x + w, display.width)
+        y0 = max(y, 0)
+        y1 = min(y + h, display.height)
+        dst = memoryview(buf)
+        if x0 < x1 and y0 < y1:
+            n = (x1 - x0) * 2
+            # _comp is free until the frame is composed
+            pixels = display.read_block(x0, y0, x1 - x0, y1 - y0,
+                                        memoryview(self._comp)[:n * (y1 - y0)])
+            s = 0
+            for r in range(y0 - y, y1 - y):
+                o = (r * w + x0 - x) * 2
+                dst[o:o + n] = pixels[s:s + n]
+                s += n
+        if self.x is None:
+            return
+        # Where the old position overlaps, the buffer shows the old sprite
+        ox0 = max(x, self.x)
+        ox1 = min(x + w, self.x + w)
+        oy0 = max(y, self.y)
+        oy1 = min(y + h, self.y + h)
+        if ox0 >= ox1 or oy0 >= oy1:
+            return
+        saved = memoryview(self._saved)
+        n = (ox1 - ox0) * 2
+        for sy in range(oy0, oy1):
+            o = ((sy - y) * w + ox0 - x) * 2
+            s = ((sy - self.y) * w + ox0 - self.x) * 2
+            dst[o:o + n] = saved[s:s + n]
+
+    def _restore(self, x, y, w, h):
+        """Put the background back over part of the previous position.
+
+        Args:
+            x (int): Left of the part, screen coordinates.
+            y (int): Top of the part.
+            w (int): Width of the part.
+            h (int): Height of the part.
+        """
+        display = self.display
+        background = self.background
+        if not callable(background) and background is not None:
+            display.fill_hrect(x, y, w, h, background)
+            return
+        buf = memoryview(self._comp)[:w * h * 2]
+        if background is None:
+            # Cut the part out of the saved rectangle
+            saved = memoryview(self._saved)
+            n = w * 2
+            for r in range(h):
+                s = ((y - self.y + r) * self.width + x - self.x) * 2
+                buf[r * n:r * n + n] = saved[s:s + n]
+        else:
+            background(x, y, w, h, buf)
+        display.draw_sprite(buf, x, y, w, h)
+
+    def _uncover(self, x, y):
+        """Restore the parts of the previous position not under x, y.
+
+        Args:
+            x (int): New left.
+            y (int): New top.
+        """
+        ox, oy = self.x, self.y
+        w = self.width
+        h = self.height
+        if ox is None:
+            return
+        if x >= ox + w or x + w <= ox or y >= oy + h or y + h <= oy:
+            self._restore(ox, oy, w, h)
+            return
+        # Top and bottom bands span the full width, sides fill between
+        top = oy
+        bottom = oy + h
+        if y > oy:
+            self._restore(ox, oy, w, y - oy)
+            top = y
+        if y + h < oy + h:
+            self._restore(ox, y + h, w, oy - y)
+            bottom = y + h
+        if x > ox:
+            self._restore(ox, top, x - ox, bottom - top)
+        if x + w < ox + w:
+            self._restore(x + w, top, ox - x, bottom - top)
+
+    def draw(self, x, y, frame=None):
+        """Draw the sprite, moving it from its previous position.
+
+        Args:
+            x (int): Left.
+            y (int): Top.
+            frame (Optional int): Frame index (default: current frame).
+        """
+        if frame is not None:
+            self.frame = frame
+        sheet = self.sheet
+        pixels = sheet[self.frame]
+        save = self.background is None
+        if save:
+            self._fetch(x, y, self._next)
+        self._uncover(x, y)
+        if self.key is None:
+            out = pixels
+        else:
+            comp = self._comp
+            if save:
+                comp[:] = self._next
+            else:
+                self._fetch(x, y, comp)
+            runs = sheet.runs(self.display, self.frame, self.key)
+            w = self.width
+            for i in range(0, len(runs), 3):
+                o = (runs[i] * w + runs[i + 1]) * 2
+                n = runs[i + 2] * 2
+                comp[o:o + n] = pixels[o:o + n]
+            out = comp
+        self.display.draw_sprite(out, x, y, self.width, self.height)
+        if save:
+            self._saved, self._next = self._next, self._saved
+        self.x = x
+        self.y = y
+
+    def hide(self):
+        """Remove the sprite, restoring its background."""
+        if self.x is not None:
+            self._restore(self.x, self.y, self.width, self.height)
+            self.x = self.y = None
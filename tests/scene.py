@@ -0,0 +1,30 @@
+"""Test scene drawn the same way on a Display and on its canvases."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'tools'))
+
+from benchmark import BoxFont  # noqa: E402
+
+FONT = BoxFont()
+# Colors that every canvas stores exactly (in PALETTE_16 and 3-3-2 RGB)
+COLORS = (0x0000, 0xFFFF, 0xF800, 0x07E0, 0x001F, 0xFFE0, 0xF81F)
+
+
+def draw_scene(d, label='Scene'):
+    """Draw fills, shapes, lines, text and off-screen parts on d.
+
+    Args:
+        d (Display or Canvas): Drawing target.
+        label (Optional string): Text drawn near the bottom.
+    """
+    d.clear(0x001F)
+    d.fill_rectangle(10, 10, 100, 60, 0xF800)
+    d.fill_circle(200, 120, 40, 0x07E0)
+    d.draw_line(0, 239, 319, 0, 0xFFFF)
+    d.draw_rectangle(250, 10, 60, 40, 0xFFE0)
+    d.draw_text(20, 200, label, FONT, 0xFFFF, 0x0000)
+    # Partly off screen, clipped by every target
+    d.fill_rectangle(300, 220, 40, 40, 0xF81F)
+    d.fill_circle(-10, 120, 30, 0xFFE0)
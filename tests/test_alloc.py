@@ -0,0 +1,129 @@
+"""Steady-state allocation tests for the Display SPI path (host CPython).
+
+Run from the repository root with:
+    python3 -m unittest discover tests
+"""
+import builtins
+import os
+import sys
+import tracemalloc
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'tools'))
+
+from emulator import Pin, SPI, load_boot  # noqa: E402
+
+# Repetitions measured after one warm-up call
+REPEAT = 200
+# Transient bytes allowed while repeating (call frames, argument tuples),
+# far below the smallest pixel or pattern buffer the driver could create
+PEAK_LIMIT = 512
+# Bytes allowed to stay allocated: counters replaced by new int objects,
+# independent of the number of repetitions
+NET_LIMIT = 64
+BUFFER_TYPES = ('bytearray', 'bytes', 'memoryview')
+
+
+class AllocationCounter(object):
+    """Count buffer constructions in boot.py and heap use around a call.
+
+    The buffer types boot.py looks up are shadowed by counting
+    factories, so every bytearray(), bytes() or memoryview() the driver
+    builds is counted.  tracemalloc reports the bytes still held
+    afterwards (net) and the highest transient use (peak).
+    """
+
+    def __init__(self, module):
+        self.module = module
+        self.created = 0
+
+    def __enter__(self):
+        for name in BUFFER_TYPES:
+            setattr(self.module, name,
+                    self._factory(getattr(builtins, name)))
+        tracemalloc.start()
+        self.base = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def _factory(self, base):
+        def make(*args, **kwargs):
+            self.created += 1
+            return base(*args, **kwargs)
+        return make
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.net = current - self.base
+        self.peak = peak - self.base
+        for name in BUFFER_TYPES:
+            if name in vars(self.module):
+                delattr(self.module, name)
+        return False
+
+
+class SteadyStateAllocationTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.boot = load_boot()
+        cls.sleep = cls.boot.sleep
+        cls.boot.sleep = lambda seconds: None
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.boot.sleep = cls.sleep
+
+    def setUp(self):
+        # A bus that goes nowhere, so only the driver allocates
+        self.display = self.boot.Display(SPI(), Pin(), Pin(), Pin())
+
+    def assertNoAllocations(self, draw):
+        draw(0)
+        with AllocationCounter(self.boot) as counter:
+            for i in range(REPEAT):
+                draw(i)
+        self.assertEqual(counter.created, 0, 'buffers built per call')
+        self.assertLess(counter.net, NET_LIMIT, 'bytes kept after the calls')
+        self.assertLess(counter.peak, PEAK_LIMIT, 'transient bytes')
+
+    def test_draw_pixel(self):
+        d = self.display
+        self.assertNoAllocations(lambda i: d.draw_pixel(i % 320, i % 240,
+                                                        0xF800))
+
+    def test_block(self):
+        d = self.display
+        buf = bytearray(8 * 8 * 2)
+        self.assertNoAllocations(lambda i: d.block(i % 300, 10,
+                                                   i % 300 + 7, 17, buf))
+
+    def test_scroll(self):
+        d = self.display
+        self.assertNoAllocations(lambda i: d.scroll(i % 320))
+
+    def test_fill_hrect_cached_color(self):
+        d = self.display
+        self.assertNoAllocations(lambda i: d.fill_hrect(i % 200, 20, 100,
+                                                        50, 0x07E0))
+
+    def test_fill_cycling_colors(self):
+        d = self.display
+        colors = (0xF800, 0x07E0, 0x001F, 0xFFFF)
+        for color in colors:
+            d.draw_hline(0, 10, 10, color)
+        self.assertNoAllocations(lambda i: d.draw_hline(0, 10, 10,
+                                                        colors[i % 4]))
+
+    def test_small_fill_pattern(self):
+        d = self.display
+        d.draw_hline(0, 10, 10, 0x07E0)
+        # Sized to the line, not to chunk_size
+        self.assertEqual(d._fill_colors[0], 0x07E0)
+        self.assertLess(len(d._fill_bufs[0]), d.chunk_size)
+        self.assertGreaterEqual(len(d._fill_bufs[0]), 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,307 @@
+"""Display drawing tests on the ILI9341 emulator (host CPython).
+
+Run from the repository root with:
+    python3 -m unittest discover tests
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import types
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'tools'))
+
+from emulator import Panel, load_boot  # noqa: E402
+from scene import draw_scene  # noqa: E402
+
+
+def gradient(w, h):
+    """Return raw RGB565 pixels of a w x h gradient."""
+    data = bytearray(w * h * 2)
+    i = 0
+    for y in range(h):
+        for x in range(w):
+            c = (x * 31 // w) << 11 | (y * 63 // h) << 5 | 0x0F
+            data[i] = c >> 8
+            data[i + 1] = c & 0xFF
+            i += 2
+    return data
+
+
+class ThreadedImageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.panel = Panel()
+        # Small transfers, so the image takes many chunks
+        self.display = self.panel.display(chunk_size=1280)
+        self.data = gradient(320, 240)
+        fd, self.path = tempfile.mkstemp(suffix='.raw')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(self.data)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_threaded_pixels(self):
+        self.display.draw_image(self.path, 0, 0, 320, 240, threaded=True)
+        self.assertEqual(self.panel.fb, self.data)
+
+    def test_failed_write_stops_reader(self):
+        d = self.display
+        boot = load_boot()
+        started = []
+
+        def start_new_thread(func, args):
+            # A threading.Thread, so the test can wait for it to end
+            thread = threading.Thread(target=func, args=args, daemon=True)
+            started.append(thread)
+            thread.start()
+
+        calls = [0]
+        block = d.block
+
+        def failing_block(*args):
+            calls[0] += 1
+            if calls[0] == 3:
+                raise OSError('bus error')
+            block(*args)
+
+        d.block = failing_block
+        real = boot._thread
+        boot._thread = types.SimpleNamespace(
+            allocate_lock=real.allocate_lock,
+            start_new_thread=start_new_thread)
+        try:
+            with self.assertRaises(OSError):
+                d.draw_image(self.path, 0, 0, 320, 240, threaded=True)
+        finally:
+            boot._thread = real
+        self.assertEqual(calls[0], 3)
+        self.assertEqual(len(started), 1)
+        started[0].join(5)
+        self.assertFalse(started[0].is_alive(), 'reader still waiting')
+
+
+class BufferedFlushTest(unittest.TestCase):
+
+    def draw(self, d):
+        d.fill_rectangle(0, 0, 320, 240, 0xF800)
+        d.fill_circle(100, 100, 30, 0x07E0)
+        d.fill_rectangle(3, 200, 30, 20, 0xFFFF)
+
+    def test_flush_in_chunks(self):
+        panel = Panel()
+        d = panel.display(buffered=True, chunk_size=4096)
+        sizes = []
+        write = panel.write
+
+        def counting_write(buf):
+            sizes.append(len(buf))
+            write(buf)
+
+        panel.write = counting_write
+        self.draw(d)
+        d.flush()
+        self.assertLessEqual(max(sizes), 4096)
+        direct = Panel()
+        self.draw(direct.display())
+        self.assertEqual(panel.fb, direct.fb)
+
+
+class ReadbackTest(unittest.TestCase):
+
+    def setUp(self):
+        self.panel = Panel()
+        self.display = self.panel.display()
+        draw_scene(self.display)
+
+    def region(self, x, y, w, h):
+        """Return the RGB565 bytes of a region of the panel."""
+        out = bytearray()
+        for r in range(y, y + h):
+            o = (r * self.panel.width + x) * 2
+            out += self.panel.fb[o:o + w * 2]
+        return out
+
+    def test_read_block(self):
+        d = self.display
+        for x, y, w, h in ((0, 0, 320, 240), (150, 80, 100, 90),
+                           (319, 239, 1, 1)):
+            self.assertEqual(d.read_block(x, y, w, h),
+                             self.region(x, y, w, h))
+
+    def test_read_block_into_buffer(self):
+        buf = bytearray(20 * 10 * 2)
+        self.assertIs(self.display.read_block(5, 5, 20, 10, buf), buf)
+        self.assertEqual(buf, self.region(5, 5, 20, 10))
+
+    def test_read_block_off_screen(self):
+        with self.assertRaises(ValueError):
+            self.display.read_block(300, 0, 40, 10)
+
+    def test_round_trip(self):
+        d = self.display
+        pixels = d.read_block(180, 100, 60, 50)
+        d.block(0, 0, 59, 49, pixels)
+        self.assertEqual(self.region(0, 0, 60, 50), pixels)
+
+    def test_save_restore(self):
+        d = self.display
+        before = bytes(self.panel.fb)
+        region = d.save_region(280, 200, 60, 60)
+        # Trimmed to the screen
+        self.assertEqual(region[:4], (280, 200, 40, 40))
+        d.fill_rectangle(280, 200, 60, 60, 0xFFFF)
+        self.assertNotEqual(bytes(self.panel.fb), before)
+        d.restore_region(region)
+        self.assertEqual(bytes(self.panel.fb), before)
+
+    def test_buffered_read_block(self):
+        panel = Panel()
+        d = panel.display(buffered=True)
+        draw_scene(d)
+        pixels = d.read_block(150, 80, 100, 90)
+        d.flush()
+        self.assertEqual(pixels, self.region(150, 80, 100, 90))
+
+    def test_screenshot(self):
+        fd, path = tempfile.mkstemp(suffix='.raw')
+        os.close(fd)
+        try:
+            self.display.screenshot(path)
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(), bytes(self.panel.fb))
+            other = Panel()
+            other.display().draw_image(path, 0, 0, 320, 240)
+            self.assertEqual(other.fb, self.panel.fb)
+        finally:
+            os.remove(path)
+
+
+class WarmStartTest(unittest.TestCase):
+
+    def setUp(self):
+        self.panel = Panel()
+        self.resets = 0
+        reset = self.panel._rst_changed
+
+        def counting_reset(pin, level):
+            if level == 0:
+                self.resets += 1
+            reset(pin, level)
+
+        self.panel._rst_changed = counting_reset
+        draw_scene(self.panel.display())
+        self.cold = self.panel.init_stats
+        self.assertEqual(self.resets, 1)
+        # Only what the next constructor sends is counted
+        self.panel.reset_stats()
+
+    def test_skips_reset(self):
+        panel = self.panel
+        fb = panel.fb
+        panel.scroll_start = 50
+        d = panel.display(warm_start=True)
+        self.assertEqual(self.resets, 1, 'panel was reset')
+        self.assertLess(panel.init_stats['commands'], self.cold['commands'])
+        self.assertTrue(panel.awake and panel.on)
+        # Same panel RAM, cleared, with scrolling back to the whole screen
+        self.assertIs(panel.fb, fb)
+        self.assertEqual(fb, bytearray(len(fb)))
+        self.assertEqual(panel.scroll_area, (0, d.height, 0))
+        self.assertEqual(panel.scroll_start, 0)
+        draw_scene(d)
+        direct = Panel()
+        draw_scene(direct.display())
+        self.assertEqual(panel.fb, direct.fb)
+
+    def test_buffered(self):
+        panel = self.panel
+        d = panel.display(warm_start=True, buffered=True)
+        self.assertEqual(self.resets, 1, 'panel was reset')
+        # The zeroed shadow buffer matches the cleared panel
+        self.assertEqual(d._fb, panel.fb)
+        draw_scene(d)
+        d.flush()
+        self.assertEqual(d._fb, panel.fb)
+
+    def test_other_rotation_initializes(self):
+        self.panel.display(warm_start=True, rotation=180)
+        self.assertEqual(self.resets, 2)
+
+    def test_sleeping_panel_initializes(self):
+        panel = Panel()
+        panel.display(warm_start=True)
+        self.assertTrue(panel.awake and panel.on)
+        # The full setup, after the three register reads
+        self.assertEqual(panel.init_stats['commands'],
+                         self.cold['commands'] + 3)
+
+
+class ClippingTest(unittest.TestCase):
+    """Drawing past the edges against a larger panel that needs no clip."""
+
+    # Margin of the reference panel around the 320 x 240 screen
+    MX = 320
+    MY = 240
+
+    def setUp(self):
+        self.panel = Panel()
+        self.display = self.panel.display()
+        self.big = Panel(320 + 2 * self.MX, 240 + 2 * self.MY)
+        self.reference = self.big.display()
+
+    def both(self, name, x, y, *args):
+        getattr(self.display, name)(x, y, *args)
+        getattr(self.reference, name)(x + self.MX, y + self.MY, *args)
+
+    def assertSameScreen(self):
+        big = self.big
+        screen = bytearray()
+        for r in range(self.MY, self.MY + 240):
+            o = (r * big.width + self.MX) * 2
+            screen += big.fb[o:o + 640]
+        self.assertEqual(self.panel.fb, screen)
+
+    def test_random_lines(self):
+        rnd = random.Random(7)
+        for _ in range(100):
+            x0 = rnd.randrange(-320, 640)
+            y0 = rnd.randrange(-240, 480)
+            x1 = rnd.randrange(-320, 640)
+            y1 = rnd.randrange(-240, 480)
+            self.display.draw_line(x0, y0, x1, y1, 0xFFFF)
+            self.reference.draw_line(x0 + self.MX, y0 + self.MY,
+                                     x1 + self.MX, y1 + self.MY, 0xFFFF)
+            self.assertSameScreen()
+            # Erase, so the next line is compared on its own
+            self.display.draw_line(x0, y0, x1, y1, 0)
+            self.reference.draw_line(x0 + self.MX, y0 + self.MY,
+                                     x1 + self.MX, y1 + self.MY, 0)
+
+    def test_shapes_past_edges(self):
+        self.both('fill_rectangle', -30, -20, 100, 60, 0xF800)
+        self.both('fill_circle', 310, 120, 40, 0x07E0)
+        self.both('draw_circle', 160, 230, 30, 0xFFFF)
+        self.both('fill_ellipse', 20, 250, 60, 30, 0x001F)
+        self.both('draw_rectangle', 290, -10, 60, 40, 0xFFE0)
+        self.both('draw_hline', -50, 100, 500, 0xF81F)
+        self.both('draw_vline', 100, -50, 400, 0xF81F)
+        # fill_polygon takes the number of sides first
+        self.display.fill_polygon(5, 0, 0, 50, 0x07FF)
+        self.reference.fill_polygon(5, self.MX, self.MY, 50, 0x07FF)
+        self.assertSameScreen()
+
+    def test_off_screen_draws_nothing(self):
+        d = self.display
+        d.fill_rectangle(400, 10, 20, 20, 0xFFFF)
+        d.fill_circle(-100, -100, 30, 0xFFFF)
+        d.draw_line(-50, -10, 400, -1, 0xFFFF)
+        self.assertEqual(self.panel.stats()['bytes'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
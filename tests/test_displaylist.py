@@ -0,0 +1,72 @@
+"""DisplayList tests on the ILI9341 emulator (host CPython).
+
+Run from the repository root with:
+    python3 -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'tools'))
+
+from emulator import Panel, install  # noqa: E402
+from scene import draw_scene  # noqa: E402
+
+install()
+
+from displaylist import DisplayList, FILL  # noqa: E402
+
+
+class DisplayListTest(unittest.TestCase):
+
+    def setUp(self):
+        self.direct = Panel()
+        draw_scene(self.direct.display())
+        self.panel = Panel()
+        self.display = self.panel.display()
+        self.scene = DisplayList(self.display)
+
+    def test_replay_matches_direct(self):
+        draw_scene(self.scene)
+        self.assertEqual(self.panel.stats()['bytes'], 0, 'drawn early')
+        self.scene.replay()
+        self.assertEqual(self.panel.fb, self.direct.fb)
+
+    def test_replay_twice_and_elsewhere(self):
+        draw_scene(self.scene)
+        self.scene.replay()
+        self.scene.replay()
+        self.assertEqual(self.panel.fb, self.direct.fb)
+        other = Panel()
+        self.scene.replay(other.display())
+        self.assertEqual(other.fb, self.direct.fb)
+
+    def test_session_is_accepted(self):
+        with self.scene.session():
+            draw_scene(self.scene)
+        self.scene.replay()
+        self.assertEqual(self.panel.fb, self.direct.fb)
+
+    def test_operations_stay_on_screen(self):
+        draw_scene(self.scene)
+        for kind, x, y, w, h, payload in self.scene.ops:
+            self.assertGreaterEqual(x, 0)
+            self.assertGreaterEqual(y, 0)
+            self.assertLessEqual(x + w, self.display.width)
+            self.assertLessEqual(y + h, self.display.height)
+
+    def test_merge_and_optimize(self):
+        scene = self.scene
+        # Ten rows of one color merge into one rectangle
+        for y in range(10):
+            scene.draw_hline(5, y, 20, 0xF800)
+        self.assertEqual(scene.recorded, 10)
+        self.assertEqual(scene.ops, [[FILL, 5, 0, 20, 10, 0xF800]])
+        # A later clear paints over everything before it
+        scene.clear(0x07E0)
+        self.assertEqual(scene.optimize(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
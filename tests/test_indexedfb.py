@@ -0,0 +1,79 @@
+"""IndexedFrameBuffer tests on the ILI9341 emulator (host CPython).
+
+Run from the repository root with:
+    python3 -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'tools'))
+
+from emulator import Panel, install  # noqa: E402
+from scene import COLORS, draw_scene  # noqa: E402
+
+install()
+
+from indexedfb import IndexedFrameBuffer  # noqa: E402
+
+
+class IndexedFrameBufferTest(unittest.TestCase):
+
+    def setUp(self):
+        direct = Panel()
+        draw_scene(direct.display())
+        self.expected = direct.fb
+
+    def check_scene(self, bpp):
+        panel = Panel()
+        frame = IndexedFrameBuffer(panel.display(), bpp=bpp)
+        draw_scene(frame)
+        self.assertEqual(panel.stats()['bytes'], 0, 'drawn before flush')
+        frame.flush()
+        self.assertEqual(panel.fb, self.expected)
+        # Nothing changed, nothing sent
+        panel.reset_stats()
+        frame.flush()
+        self.assertEqual(panel.stats()['bytes'], 0)
+
+    def test_scene_4bpp(self):
+        self.check_scene(4)
+
+    def test_scene_8bpp(self):
+        self.check_scene(8)
+
+    def test_exact_colors(self):
+        panel = Panel()
+        for bpp in (4, 8):
+            frame = IndexedFrameBuffer(panel.display(), bpp=bpp)
+            for color in COLORS:
+                self.assertEqual(frame.palette[frame.index_of(color)], color)
+
+    def test_odd_edges_4bpp(self):
+        # Fills that start and end on half bytes
+        panel = Panel()
+        display = panel.display()
+        frame = IndexedFrameBuffer(display, bpp=4)
+        direct = Panel()
+        target = direct.display()
+        for d in (frame, target):
+            d.clear(0x001F)
+            d.fill_rectangle(3, 5, 7, 4, 0xF800)
+            d.draw_vline(11, 0, 30, 0xFFFF)
+            d.draw_pixel(12, 12, 0x07E0)
+        frame.flush()
+        self.assertEqual(panel.fb, direct.fb)
+
+    def test_set_palette(self):
+        panel = Panel()
+        frame = IndexedFrameBuffer(panel.display(), bpp=4)
+        frame.clear(0xF800)
+        frame.flush()
+        frame.set_palette(frame.index_of(0xF800), 0x07E0)
+        frame.flush()
+        self.assertEqual(panel.pixel(160, 120), 0x07E0)
+
+
+if __name__ == '__main__':
+    unittest.main()
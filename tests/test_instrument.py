@@ -0,0 +1,58 @@
+"""Byte accounting tests for instrument.py on the emulator (host CPython).
+
+Run from the repository root with:
+    python3 -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'tools'))
+
+from emulator import Panel, install  # noqa: E402
+
+install()
+
+from instrument import Instrument  # noqa: E402
+
+# Commands sent per test, each a command byte and its parameters
+REPEAT = 10
+
+
+class CommandBytesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.panel = Panel()
+        self.display = self.panel.display()
+        self.probe = Instrument()
+        self.probe.attach(self.display)
+
+    def tearDown(self):
+        self.probe.detach()
+
+    def recorded(self):
+        stats = self.probe.stats
+        return sum(stats[name].bytes for name in ('write_cmd', 'write_data')
+                   if name in stats)
+
+    def send(self):
+        d = self.display
+        for i in range(REPEAT):
+            d.scroll(i)
+            d.set_scroll(i, 0)
+
+    def test_outside_session(self):
+        self.send()
+        self.assertEqual(self.probe.stats['write_cmd'].count, REPEAT * 2)
+        self.assertEqual(self.recorded(), self.panel.stats()['bytes'])
+
+    def test_inside_session(self):
+        with self.display:
+            self.send()
+        self.assertEqual(self.probe.stats['write_cmd'].count, REPEAT * 2)
+        self.assertEqual(self.recorded(), self.panel.stats()['bytes'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""TileRenderer tests on the ILI9341 emulator (host CPython).
+
+Run from the repository root with:
+    python3 -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'tools'))
+
+from emulator import Panel, install  # noqa: E402
+from scene import draw_scene  # noqa: E402
+
+install()
+
+from tiles import TileRenderer  # noqa: E402
+
+
+class TileRendererTest(unittest.TestCase):
+
+    def setUp(self):
+        self.panel = Panel()
+        self.renderer = TileRenderer(self.panel.display())
+        self.tiles = self.renderer.columns * self.renderer.rows
+
+    def expected(self, label='Scene'):
+        direct = Panel()
+        draw_scene(direct.display(), label)
+        return direct.fb
+
+    def render(self, label='Scene'):
+        draw_scene(self.renderer.begin(), label)
+        return self.renderer.end()
+
+    def test_first_frame_sends_every_tile(self):
+        self.assertEqual(self.render(), self.tiles)
+        self.assertEqual(self.panel.fb, self.expected())
+
+    def test_unchanged_frame_sends_nothing(self):
+        self.render()
+        self.panel.reset_stats()
+        self.assertEqual(self.render(), 0)
+        self.assertEqual(self.renderer.skipped, self.tiles)
+        self.assertEqual(self.panel.stats()['bytes'], 0)
+        self.assertEqual(self.panel.fb, self.expected())
+
+    def test_changed_text_sends_its_tiles(self):
+        self.render()
+        pushed = self.render('Scenf')
+        # The last letter lies within one or two tile columns
+        self.assertGreater(pushed, 0)
+        self.assertLessEqual(pushed, 2)
+        self.assertEqual(self.panel.fb, self.expected('Scenf'))
+
+    def test_invalidate(self):
+        self.render()
+        self.renderer.invalidate()
+        self.assertEqual(self.render(), self.tiles)
+
+    def test_uneven_tiles(self):
+        # Tiles larger than chunk_size and cut off at the screen edges
+        panel = Panel()
+        renderer = TileRenderer(panel.display(chunk_size=1024), 48, 100)
+        draw_scene(renderer.begin())
+        self.assertEqual(renderer.end(), renderer.columns * renderer.rows)
+        self.assertEqual(panel.fb, self.expected())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+"""Incremental tile renderer for the ILI9341 Display class."""
+from array import array
+from micropython import const
+try:
+    from binascii import crc32
+except ImportError:
+    from ubinascii import crc32
+from displaylist import DisplayList, FILL
+
+
+class TileRenderer(object):
+    """Redraw a whole screen every frame but only send the tiles that changed.
+
+    Each frame is recorded into a DisplayList, then rasterized one tile at
+    a time into a small scratch buffer.  A CRC of every tile is compared
+    with the previous frame and only tiles whose CRC differs are written
+    to the panel, so a dashboard that updates a few numbers costs a few
+    tiles of bus traffic per frame.
+
+    Example:
+        renderer = TileRenderer(display)
+        while True:
+            frame = renderer.begin()
+            frame.clear(color565(0, 0, 64))
+            frame.draw_text(10, 10, 'RPM {0}'.format(rpm), font, white)
+            renderer.end()
+
+    Note:
+        Anything drawn on the display outside begin()/end() is not known
+        to the renderer, call invalidate() afterwards.
+    """
+
+    # Solid color tile rows kept before the cache is emptied
+    MAX_ROWS = const(32)
+
+    def __init__(self, display, tile_width=32, tile_height=32):
+        """Initialize renderer.
+
+        Args:
+            display (Display): Display to update.
+            tile_width (int): Tile width in pixels (default: 32).
+            tile_height (int): Tile height in pixels (default: 32).
+        """
+        self.display = display
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.columns = (display.width + tile_width - 1) // tile_width
+        self.rows = (display.height + tile_height - 1) // tile_height
+        self.frame = DisplayList(display)
+        self._scratch = bytearray(tile_width * tile_height * 2)
+        # One tile row per solid color, by color
+        self._rows = {}
+        self._hashes = array('L', [0] * (self.columns * self.rows))
+        self._known = False
+        # Tiles written / skipped by the last end()
+        self.pushed = 0
+        self.skipped = 0
+
+    def invalidate(self):
+        """Send every tile on the next end()."""
+        self._known = False
+
+    def begin(self):
+        """Start a frame.
+
+        Returns:
+            DisplayList: Canvas to draw the complete frame on.
+        """
+        self.frame.reset()
+        return self.frame
+
+    def _row(self, color):
+        """Return a tile wide row of one color.
+
+        Args:
+            color (int): RGB565 color value.
+        Returns:
+            memoryview: tile_width pixels.
+        """
+        row = self._rows.get(color)
+        if row is None:
+            if len(self._rows) >= self.MAX_ROWS:
+                self._rows = {}
+            size = self.tile_width * 2
+            row = memoryview(bytearray(size))
+            if color:
+                row[0] = color >> 8
+                row[1] = color & 0xFF
+                n = 2
+                while n < size:
+                    m = min(n, size - n)
+                    row[n:n + m] = row[:m]
+                    n += m
+            self._rows[color] = row
+        return row
+
+    def _buckets(self, ops):
+        """List the operations touching each tile.
+
+        Args:
+            ops (list): Display list operations.
+        Returns:
+            list: One list of operations per tile, in drawing order.
+        """
+        tw = self.tile_width
+        th = self.tile_height
+        columns = self.columns
+        buckets = [[] for _ in range(columns * self.rows)]
+        for op in ops:
+            x, y, w, h = op[1], op[2], op[3], op[4]
+            if w <= 0 or h <= 0:
+                continue
+            c1 = min((x + w - 1) // tw, columns - 1)
+            r1 = min((y + h - 1) // th, self.rows - 1)
+            for r in range(max(y // th, 0), r1 + 1):
+                for c in range(max(x // tw, 0), c1 + 1):
+                    buckets[r * columns + c].append(op)
+        return buckets
+
+    def _rasterize(self, ops, tx, ty, tw, th):
+        """Draw the operations of one tile into the scratch buffer.
+
+        Args:
+            ops (list): Operations touching the tile.
+            tx, ty (int): Top left of the tile.
+            tw, th (int): Size of the tile.
+        Returns:
+            memoryview: tw x th RGB565 pixels.
+        """
+        out = memoryview(self._scratch)[:tw * th * 2]
+        row = tw * 2
+        # Areas no operation covers are black like a cleared panel
+        black = self._row(0)
+        for o in range(0, th * row, row):
+            out[o:o + row] = black[:row]
+        for kind, x, y, w, h, payload in ops:
+            x0 = max(x, tx)
+            y0 = max(y, ty)
+            x1 = min(x + w, tx + tw)
+            y1 = min(y + h, ty + th)
+            n = (x1 - x0) * 2
+            o = (y0 - ty) * row + (x0 - tx) * 2
+            if kind == FILL:
+                src = self._row(payload)
+                for _ in range(y1 - y0):
+                    out[o:o + n] = src[:n]
+                    o += row
+            else:
+                src = memoryview(payload)
+                stride = w * 2
+                s = (y0 - y) * stride + (x0 - x) * 2
+                for _ in range(y1 - y0):
+                    out[o:o + n] = src[s:s + n]
+                    o += row
+                    s += stride
+        return out
+
+    def end(self):
+        """Finish the frame and write the tiles that changed.
+
+        Returns:
+            int: Number of tiles written.
+        """
+        display = self.display
+        frame = self.frame
+        frame.optimize()
+        buckets = self._buckets(frame.ops)
+        hashes = self._hashes
+        known = self._known
+        tw = self.tile_width
+        th = self.tile_height
+        self.pushed = 0
+        self.skipped = 0
+        with display:
+            i = 0
+            for ty in range(0, display.height, th):
+                h = min(th, display.height - ty)
+                for tx in range(0, display.width, tw):
+                    w = min(tw, display.width - tx)
+                    pixels = self._rasterize(buckets[i], tx, ty, w, h)
+                    crc = crc32(pixels)
+                    if known and hashes[i] == crc:
+                        self.skipped += 1
+                    else:
+                        hashes[i] = crc
+                        display.block(tx, ty, tx + w - 1, ty + h - 1, pixels)
+                        self.pushed += 1
+                    i += 1
+        self._known = True
+        return self.pushed
@@ -0,0 +1,153 @@
+"""Convert a BDF bitmap font to the BFNT format (host CPython).
+
+Usage:
+    python3 bdf2font.py input.bdf output.bfnt [ranges]
+
+ranges optionally limits the codepoints, e.g. 0x20-0x7E,0x4E00-0x9FA5.
+binfont.BinFont reads the result on the device, see binfont.py for the
+file layout.  Glyphs are placed in a cell of the font bounding box height
+using their BBX offsets, so all letters share one baseline.
+"""
+import struct
+import sys
+
+
+def parse_ranges(text):
+    """Parse a list of codepoint ranges.
+
+    Args:
+        text (string): Comma separated values or low-high pairs.
+    Returns:
+        list: (low, high) tuples, inclusive.
+    """
+    ranges = []
+    for part in text.split(','):
+        low, _, high = part.partition('-')
+        low = int(low, 0)
+        ranges.append((low, int(high, 0) if high else low))
+    return ranges
+
+
+def read_bdf(lines):
+    """Read glyph bitmaps from a BDF file.
+
+    Args:
+        lines (list): Lines of the BDF file.
+    Returns:
+        tuple: (cell height, dict of codepoint:
+                (advance width, left offset, top row, bitmap rows))
+    """
+    height = ascent = None
+    glyphs = {}
+    i = 0
+    while i < len(lines):
+        words = lines[i].split()
+        i += 1
+        if not words:
+            continue
+        if words[0] == 'FONTBOUNDINGBOX':
+            fw, fh, fx, fy = [int(v) for v in words[1:5]]
+            height = fh
+            ascent = fh + fy
+        elif words[0] == 'STARTCHAR':
+            code = advance = None
+            while True:
+                words = lines[i].split()
+                i += 1
+                if words[0] == 'ENCODING':
+                    code = int(words[1])
+                elif words[0] == 'DWIDTH':
+                    advance = int(words[1])
+                elif words[0] == 'BBX':
+                    bw, bh, bx, by = [int(v) for v in words[1:5]]
+                elif words[0] == 'BITMAP':
+                    break
+            rows = []
+            for _ in range(bh):
+                value = int(lines[i].strip(), 16)
+                bits = len(lines[i].strip()) * 4
+                i += 1
+                rows.append([(value >> (bits - 1 - x)) & 1
+                             for x in range(bw)])
+            if code is None or code < 0:
+                continue
+            if advance is None:
+                advance = bw + bx
+            glyphs[code] = (advance, bx, ascent - by - bh, rows)
+    if height is None:
+        raise ValueError('FONTBOUNDINGBOX missing.')
+    return height, glyphs
+
+
+def encode_glyph(height, advance, bx, top, rows):
+    """Pack a glyph into column bytes.
+
+    Args:
+        height (int): Cell height.
+        advance (int): Letter width in pixels.
+        bx (int): Left offset of the bitmap.
+        top (int): Row of the bitmap's top edge in the cell.
+        rows (list): Bitmap rows.
+    Returns:
+        bytearray: advance * ((height + 7) // 8) bytes.
+    """
+    cb = (height + 7) // 8
+    out = bytearray(advance * cb)
+    for r, row in enumerate(rows):
+        y = top + r
+        if not 0 <= y < height:
+            continue
+        for c, bit in enumerate(row):
+            x = bx + c
+            if bit and 0 <= x < advance:
+                out[x * cb + (y >> 3)] |= 1 << (y & 7)
+    return out
+
+
+def convert(height, glyphs, ranges=None):
+    """Build a BFNT file.
+
+    Args:
+        height (int): Cell height.
+        glyphs (dict): Output of read_bdf().
+        ranges (Optional list): (low, high) codepoint ranges to keep.
+    Returns:
+        bytes: File contents.
+    """
+    codes = sorted(c for c in glyphs if ranges is None or
+                   any(low <= c <= high for low, high in ranges))
+    if not codes:
+        raise ValueError('No glyphs selected.')
+    width = max(glyphs[c][0] for c in codes)
+    if width > 255:
+        raise ValueError('Glyphs wider than 255 pixels are not supported.')
+    size = 1 + width * ((height + 7) // 8)
+    records = bytearray()
+    for c in codes:
+        advance, bx, top, rows = glyphs[c]
+        record = bytes((advance,)) + encode_glyph(height, advance, bx, top,
+                                                  rows)
+        records += record + bytes(size - len(record))
+    head = b'BFNT' + struct.pack('>HHI', width, height, len(codes))
+    index = b''.join(struct.pack('>I', c) for c in codes)
+    return head + index + bytes(records)
+
+
+def main(argv):
+    if len(argv) not in (3, 4):
+        print(__doc__)
+        return 2
+    with open(argv[1], encoding='latin-1') as f:
+        height, glyphs = read_bdf(f.read().splitlines())
+    ranges = parse_ranges(argv[3]) if len(argv) == 4 else None
+    out = convert(height, glyphs, ranges)
+    with open(argv[2], 'wb') as f:
+        f.write(out)
+    count = struct.unpack_from('>I', out, 8)[0]
+    print('{0} glyphs, height {1}: {2} bytes'.format(count, height,
+                                                     len(out)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
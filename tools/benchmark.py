@@ -0,0 +1,313 @@
+"""Throughput benchmarks for Display on the ILI9341 emulator (host CPython).
+
+Usage:
+    python3 benchmark.py [--spi-hz 40000000] [--txn-us 1.0] [--only NAME]
+                         [--save FILE] [--baseline FILE] [--tolerance 5]
+
+Every case runs on a fresh emulated panel and reports the transactions
+(CS assertions), bytes on the bus, Python function calls made in the
+driver and the estimated panel time at the given SPI clock.  With
+--baseline the transactions, bytes and calls of each case are compared
+with a file written by --save and the exit status is 1 if any of them
+grew by more than --tolerance percent.  tools/bench_baseline.json holds
+the numbers of the current tree.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+from emulator import Panel, ROOT, load_boot
+
+TOOLS = os.path.dirname(os.path.abspath(__file__))
+COUNTERS = ('transactions', 'bytes', 'calls')
+
+
+class BoxFont(object):
+    """Synthetic fixed width font, the XglcdFont interface without a file."""
+
+    width = 8
+    height = 12
+
+    def get_letter(self, letter, color, background=0, landscape=False):
+        w = self.width
+        h = self.height
+        buf = bytearray(w * h * 2)
+        bits = ord(letter)
+        for i in range(w * h):
+            c = color if (bits >> (i % 7)) & 1 else background
+            buf[i * 2] = c >> 8
+            buf[i * 2 + 1] = c & 0xFF
+        if landscape:
+            return buf, h, w
+        return buf, w, h
+
+    def measure_text(self, text, spacing=1):
+        return len(text) * (self.width + spacing)
+
+
+def image_file(w, h):
+    """Write a raw RGB565 gradient image and return its path."""
+    data = bytearray(w * h * 2)
+    i = 0
+    for y in range(h):
+        for x in range(w):
+            c = (x * 31 // w) << 11 | (y * 63 // h) << 5 | 0x0F
+            data[i] = c >> 8
+            data[i + 1] = c & 0xFF
+            i += 2
+    return temp_file('.raw', data)
+
+
+def rle_file(w, h):
+    """Write a palette R565 image of horizontal bands, return its path."""
+    palette = (0x0000, 0xF800, 0x07E0, 0x001F)
+    head = bytearray(b'R565')
+    for v in (w, h, len(palette)) + palette:
+        head += bytes((v >> 8, v & 0xFF))
+    rows = []
+    for y in range(h):
+        row = bytearray()
+        left = w
+        while left:
+            n = min(left, 128)
+            row += bytes((0x80 | (n - 1), (y // 16) % len(palette)))
+            left -= n
+        rows.append(row)
+    offsets = bytearray()
+    o = 0
+    for row in rows + [b'']:
+        offsets += o.to_bytes(4, 'big')
+        o += len(row)
+    return temp_file('.rle', head + offsets + b''.join(rows))
+
+
+def temp_file(suffix, data):
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    return path
+
+
+def buffered_frame(d):
+    d.fill_rectangle(10, 10, 100, 60, 0xF800)
+    d.fill_circle(200, 120, 40, 0x07E0)
+    d.draw_text(20, 200, 'Buffered', FONT, 0xFFFF)
+    d.flush()
+
+
+FONT = BoxFont()
+IMAGE = None
+RLE = None
+
+# name: construct with warm_start (on a panel set up by a first Display)
+INIT_CASES = [
+    ('init_cold', False),
+    ('init_warm', True),
+]
+
+# name: (Display keyword arguments, function of the display)
+CASES = [
+    ('clear', {}, lambda d: d.clear(0x001F)),
+    ('fill_hrect', {}, lambda d: d.fill_hrect(20, 20, 200, 150, 0xF800)),
+    ('fill_rectangle', {},
+     lambda d: d.fill_rectangle(20, 20, 200, 150, 0xF800)),
+    ('fill_circle', {}, lambda d: d.fill_circle(160, 120, 100, 0x07E0)),
+    ('fill_ellipse', {}, lambda d: d.fill_ellipse(160, 120, 140, 80, 0x07E0)),
+    ('fill_polygon', {},
+     lambda d: d.fill_polygon(7, 160, 120, 100, 0xFFE0, rotate=15)),
+    ('fill_round_rect', {},
+     lambda d: d.fill_round_rect(20, 20, 200, 150, 20, 0xF81F)),
+    ('fill_arc', {}, lambda d: d.fill_arc(160, 120, 100, 30, 300, 0x07FF)),
+    ('draw_pixel', {},
+     lambda d: [d.draw_pixel(x, x // 2, 0xFFFF) for x in range(200)]),
+    ('draw_hline', {}, lambda d: d.draw_hline(0, 100, 320, 0xFFFF)),
+    ('draw_vline', {}, lambda d: d.draw_vline(100, 0, 240, 0xFFFF)),
+    ('draw_line_shallow', {},
+     lambda d: d.draw_line(0, 10, 319, 200, 0xFFFF)),
+    ('draw_line_steep', {}, lambda d: d.draw_line(10, 0, 200, 239, 0xFFFF)),
+    ('draw_lines', {},
+     lambda d: d.draw_lines([[0, 0], [300, 40], [20, 200], [310, 230]],
+                            0xFFFF)),
+    ('draw_rectangle', {},
+     lambda d: d.draw_rectangle(20, 20, 200, 150, 0xFFFF)),
+    ('draw_circle', {}, lambda d: d.draw_circle(160, 120, 100, 0xFFFF)),
+    ('draw_ellipse', {}, lambda d: d.draw_ellipse(160, 120, 140, 80, 0xFFFF)),
+    ('draw_polygon', {},
+     lambda d: d.draw_polygon(7, 160, 120, 100, 0xFFFF, rotate=15)),
+    ('draw_arc', {},
+     lambda d: d.draw_arc(160, 120, 100, 30, 300, 0xFFFF, thickness=4)),
+    ('draw_thick_line', {},
+     lambda d: d.draw_thick_line(10, 20, 300, 200, 9, 0xFFFF, rounded=True)),
+    ('draw_text', {},
+     lambda d: d.draw_text(0, 100, 'The quick brown fox jumps', FONT,
+                           0xFFFF)),
+    ('draw_text_cached', {},
+     lambda d: [d.draw_text(0, y, 'The quick brown fox jumps', FONT, 0xFFFF)
+                for y in range(0, 240, 24)]),
+    ('draw_image', {}, lambda d: d.draw_image(IMAGE, 0, 0, 320, 240)),
+    ('draw_image_clipped', {},
+     lambda d: d.draw_image(IMAGE, 200, 150, 320, 240)),
+    ('draw_rle_image', {}, lambda d: d.draw_rle_image(RLE, 0, 0)),
+    ('buffered_flush', {'buffered': True}, buffered_frame),
+]
+# clear() against the largest single transfer
+CASES += [('clear_chunk_{0}'.format(n), {'chunk_size': n},
+           lambda d: d.clear(0x001F))
+          for n in (1024, 2048, 4096, 8192, 16384, 32768)]
+
+
+def count_calls(func, *args, **kwargs):
+    """Call func, counting the Python calls made in the driver modules.
+
+    Returns:
+        tuple: (result of func, number of calls)
+    """
+    calls = [0]
+
+    def profile(frame, event, arg):
+        if event == 'call':
+            path = frame.f_code.co_filename
+            if path.startswith(ROOT) and not path.startswith(TOOLS):
+                calls[0] += 1
+
+    sys.setprofile(profile)
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        sys.setprofile(None)
+    return result, calls[0]
+
+
+def run_case(kwargs, func, spi_hz, txn_us):
+    """Run one case on a fresh panel.
+
+    Args:
+        kwargs (dict): Display keyword arguments.
+        func (function): Drawing calls, given the display.
+        spi_hz (int): SPI clock of the virtual bus.
+        txn_us (float): Fixed cost per transaction.
+    Returns:
+        tuple: (counters dict, estimated ms)
+    """
+    panel = Panel(spi_hz=spi_hz, transaction_us=txn_us)
+    display = panel.display(**kwargs)
+    calls = count_calls(func, display)[1]
+    counters = panel.stats()
+    counters['calls'] = calls
+    return counters, panel.estimate_us(spi_hz, txn_us) / 1000.0
+
+
+def run_init(warm, spi_hz, txn_us):
+    """Construct a Display, from power on or on an already set up panel.
+
+    Args:
+        warm (bool): Construct twice, measure the second with warm_start.
+        spi_hz (int): SPI clock of the virtual bus.
+        txn_us (float): Fixed cost per transaction.
+    Returns:
+        tuple: (counters dict, virtual ms until the first frame is shown)
+    """
+    panel = Panel(spi_hz=spi_hz, transaction_us=txn_us)
+    if warm:
+        panel.display()
+    start = panel.clock_us
+    calls = count_calls(panel.display, warm_start=warm)[1]
+    counters = panel.init_stats
+    counters['calls'] = calls
+    # Cold: the cleared panel appears at DISPLAY_ON, warm: it is already on
+    end = panel.clock_us if warm else panel.display_on_us
+    return counters, (end - start) / 1000.0
+
+
+def report(results, name, counters, ms):
+    """Print one result line and keep the counters."""
+    results[name] = dict((key, counters[key]) for key in COUNTERS + (
+        'pixels',))
+    print('{0:<20} {1:>7} {2:>8} {3:>8} {4:>9.2f}'.format(
+        name, counters['transactions'], counters['bytes'],
+        counters['calls'], ms))
+
+
+def compare(results, baseline, tolerance):
+    """Return the regressions of results against a baseline.
+
+    Args:
+        results (dict): name: counters of this run.
+        baseline (dict): name: counters of the stored run.
+        tolerance (float): Allowed growth in percent.
+    Returns:
+        list: Messages, empty when nothing regressed.
+    """
+    problems = []
+    for name in sorted(results):
+        old = baseline.get(name)
+        if old is None:
+            continue
+        for key in COUNTERS:
+            before = old.get(key)
+            after = results[name][key]
+            if before is None:
+                continue
+            if after > before * (1 + tolerance / 100.0):
+                problems.append('{0}: {1} {2} -> {3} ({4:+.1f}%)'.format(
+                    name, key, before, after,
+                    (after - before) * 100.0 / max(before, 1)))
+    return problems
+
+
+def main():
+    global IMAGE, RLE
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--spi-hz', type=int, default=40000000,
+                        help='SPI clock used for time estimates')
+    parser.add_argument('--txn-us', type=float, default=1.0,
+                        help='fixed cost per transaction in microseconds')
+    parser.add_argument('--only', action='append',
+                        help='run only this case (repeatable)')
+    parser.add_argument('--save', help='write the results as JSON')
+    parser.add_argument('--baseline', help='JSON results to compare with')
+    parser.add_argument('--tolerance', type=float, default=5.0,
+                        help='allowed growth in percent (default 5)')
+    args = parser.parse_args()
+
+    # Import boot.py up front so its import is not counted as calls
+    load_boot()
+    IMAGE = image_file(320, 240)
+    RLE = rle_file(320, 240)
+    results = {}
+    print('{0:<20} {1:>7} {2:>8} {3:>8} {4:>9}'.format(
+        'case', 'txns', 'bytes', 'calls', 'est ms'))
+    try:
+        for name, warm in INIT_CASES:
+            if args.only and name not in args.only:
+                continue
+            counters, ms = run_init(warm, args.spi_hz, args.txn_us)
+            report(results, name, counters, ms)
+        for name, kwargs, func in CASES:
+            if args.only and name not in args.only:
+                continue
+            counters, ms = run_case(kwargs, func, args.spi_hz, args.txn_us)
+            report(results, name, counters, ms)
+    finally:
+        os.remove(IMAGE)
+        os.remove(RLE)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+            f.write('\n')
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        problems = compare(results, baseline, args.tolerance)
+        for line in problems:
+            print('REGRESSION ' + line)
+        if problems:
+            sys.exit(1)
+        print('No regressions against {0}.'.format(args.baseline))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,397 @@
+"""ILI9341 command stream emulator for running Display on a PC (CPython).
+
+Stands in for machine.Pin and machine.SPI and decodes what the driver
+sends into an in-memory RGB565 frame buffer, so drawing code can be
+checked and measured without hardware:
+
+    from emulator import Panel
+    panel = Panel()
+    display = panel.display(rotation=180)
+    display.fill_circle(160, 120, 40, 0xFFFF)
+    print(panel.pixel(160, 120), panel.stats())
+
+Frame buffer coordinates are the driver's coordinates (MADCTL is
+recorded, not applied).  boot.py's sleep() and ticks_ms() run on a
+virtual clock (Panel.clock_us) that also advances with the estimated bus
+time, so constructing a Display is instant and its timing can be read.
+"""
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SWRESET = 0x01
+SLPIN = 0x10
+SLPOUT = 0x11
+DISPLAY_OFF = 0x28
+DISPLAY_ON = 0x29
+SET_COLUMN = 0x2A
+SET_PAGE = 0x2B
+WRITE_RAM = 0x2C
+READ_RAM = 0x2E
+VSCRDEF = 0x33
+MADCTL = 0x36
+VSCRSADD = 0x37
+PIXFMT = 0x3A
+WRITE_RAM_CONT = 0x3C
+RDMODE = 0x0A
+RDMADCTL = 0x0B
+RDPIXFMT = 0x0C
+
+
+class Pin(object):
+    """machine.Pin stand-in that reports level changes to a listener."""
+
+    OUT = 1
+    IN = 0
+
+    def __init__(self, id=None, mode=None, value=None, **kwargs):
+        self.id = id
+        self.level = 0 if value is None else value
+        self.listener = None
+
+    def init(self, mode=None, value=None, **kwargs):
+        if value is not None:
+            self(value)
+
+    def __call__(self, value=None):
+        if value is None:
+            return self.level
+        value = 1 if value else 0
+        if value != self.level:
+            self.level = value
+            if self.listener is not None:
+                self.listener(self, value)
+
+    def value(self, value=None):
+        return self(value)
+
+    def on(self):
+        self(1)
+
+    def off(self):
+        self(0)
+
+
+class SPI(object):
+    """machine.SPI stand-in that feeds a Panel."""
+
+    def __init__(self, *args, **kwargs):
+        self.panel = None
+        self.baudrate = kwargs.get('baudrate')
+
+    def init(self, *args, **kwargs):
+        if 'baudrate' in kwargs:
+            self.baudrate = kwargs['baudrate']
+
+    def deinit(self):
+        pass
+
+    def write(self, buf):
+        if self.panel is not None:
+            self.panel.write(buf)
+
+    def readinto(self, buf, write=0):
+        if self.panel is not None:
+            self.panel.read(buf)
+        else:
+            for i in range(len(buf)):
+                buf[i] = 0
+
+
+class SoftI2C(object):
+    """machine.SoftI2C stand-in, only here so boot.py imports."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+class WDT(object):
+    """machine.WDT stand-in that counts feeds."""
+
+    def __init__(self, *args, **kwargs):
+        self.feeds = 0
+
+    def feed(self):
+        self.feeds += 1
+
+
+def install():
+    """Provide the machine and micropython modules boot.py imports."""
+    if 'machine' not in sys.modules:
+        machine = types.ModuleType('machine')
+        machine.Pin = Pin
+        machine.SPI = SPI
+        machine.SoftI2C = SoftI2C
+        machine.WDT = WDT
+        sys.modules['machine'] = machine
+    if 'micropython' not in sys.modules:
+        micropython = types.ModuleType('micropython')
+        micropython.const = lambda value: value
+        sys.modules['micropython'] = micropython
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+
+def load_boot():
+    """Import boot.py from the repository root (the app itself is skipped).
+
+    Returns:
+        module: The boot module.
+    """
+    install()
+    import boot
+    return boot
+
+
+class Panel(object):
+    """Decoded ILI9341 state and traffic counters."""
+
+    def __init__(self, width=320, height=240, spi_hz=40000000,
+                 transaction_us=1.0):
+        self.width = width
+        self.height = height
+        self.spi_hz = spi_hz
+        self.transaction_us = transaction_us
+        self.fb = bytearray(width * height * 2)
+        self.slept = 0.0
+        self.clock_us = 0.0
+        # Virtual time of the last DISPLAY_ON
+        self.display_on_us = None
+        self.init_stats = None
+        self.reset_state()
+        self.reset_stats()
+
+    def reset_state(self):
+        """Power-on register values."""
+        self.command = None
+        self.params = bytearray()
+        self.columns = (0, self.width - 1)
+        self.pages = (0, self.height - 1)
+        self.pointer = None
+        self.pending = None
+        self.madctl = 0
+        self.pixfmt = 0x66
+        self.scroll_area = (0, self.height, 0)
+        self.scroll_start = 0
+        self.awake = False
+        self.on = False
+        self.reads = []
+
+    def reset_stats(self):
+        """Zero the traffic counters."""
+        self.transactions = 0
+        self.writes = 0
+        self.bytes = 0
+        self.pixels = 0
+        self.commands = {}
+
+    def display(self, **kwargs):
+        """Create a boot.Display wired to this panel.
+
+        Args:
+            **kwargs: Display constructor arguments (width/height default
+                to the panel size).
+        Returns:
+            Display: Driver instance.  The counters are reset after its
+                init, what the init sent is kept in init_stats.
+        """
+        boot = load_boot()
+        boot.sleep = self.sleep
+        boot.ticks_ms = self.ticks_ms
+        self.cs = Pin('cs', value=1)
+        self.dc = Pin('dc')
+        self.rst = Pin('rst', value=1)
+        self.cs.listener = self._cs_changed
+        self.rst.listener = self._rst_changed
+        spi = SPI()
+        spi.panel = self
+        kwargs.setdefault('width', self.width)
+        kwargs.setdefault('height', self.height)
+        display = boot.Display(spi, self.cs, self.dc, self.rst, **kwargs)
+        self.init_stats = self.stats()
+        self.reset_stats()
+        return display
+
+    def sleep(self, seconds):
+        """Virtual time.sleep used by boot.py."""
+        self.slept += seconds
+        self.clock_us += seconds * 1000000
+
+    def ticks_ms(self):
+        """Virtual time.ticks_ms used by boot.py."""
+        return int(self.clock_us // 1000)
+
+    def _cs_changed(self, pin, level):
+        if level == 0:
+            self.transactions += 1
+            self.clock_us += self.transaction_us
+        else:
+            # Raising CS ends any read in progress
+            self.reads = []
+
+    def _rst_changed(self, pin, level):
+        if level == 0:
+            self.reset_state()
+
+    def write(self, buf):
+        self.writes += 1
+        self.bytes += len(buf)
+        self.clock_us += len(buf) * 8000000.0 / self.spi_hz
+        if self.dc.level == 0:
+            for b in bytes(buf):
+                self._begin(b)
+        elif self.command in (WRITE_RAM, WRITE_RAM_CONT):
+            self._pixels(bytes(buf))
+        elif self.command is not None:
+            self.params += bytes(buf)
+            self._apply()
+
+    def read(self, buf):
+        self.clock_us += len(buf) * 8000000.0 / self.spi_hz
+        for i in range(len(buf)):
+            buf[i] = self.reads.pop(0) if self.reads else self._read_pixel()
+
+    def _begin(self, command):
+        self.command = command
+        self.params = bytearray()
+        self.commands[command] = self.commands.get(command, 0) + 1
+        self.reads = []
+        if command == WRITE_RAM:
+            self.pointer = [self.columns[0], self.pages[0]]
+            self.pending = None
+        elif command == WRITE_RAM_CONT:
+            if self.pointer is None:
+                self.pointer = [self.columns[0], self.pages[0]]
+            self.pending = None
+        elif command == READ_RAM:
+            self.pointer = [self.columns[0], self.pages[0]]
+            self.reads = [0]
+        elif command == RDMODE:
+            self.reads = [0, 0x08 | self.awake << 4 | self.on << 2 |
+                          (0x80 if self.awake else 0)]
+        elif command == RDMADCTL:
+            self.reads = [0, self.madctl]
+        elif command == RDPIXFMT:
+            self.reads = [0, self.pixfmt]
+        elif command == SWRESET:
+            fb = self.fb
+            self.reset_state()
+            self.fb = fb
+        elif command == SLPOUT:
+            self.awake = True
+        elif command == SLPIN:
+            self.awake = False
+        elif command == DISPLAY_ON:
+            self.on = True
+            self.display_on_us = self.clock_us
+        elif command == DISPLAY_OFF:
+            self.on = False
+
+    def _apply(self):
+        p = self.params
+        command = self.command
+        if command == SET_COLUMN and len(p) == 4:
+            self.columns = (p[0] << 8 | p[1], p[2] << 8 | p[3])
+        elif command == SET_PAGE and len(p) == 4:
+            self.pages = (p[0] << 8 | p[1], p[2] << 8 | p[3])
+        elif command == MADCTL and len(p) == 1:
+            self.madctl = p[0]
+        elif command == PIXFMT and len(p) == 1:
+            self.pixfmt = p[0]
+        elif command == VSCRDEF and len(p) == 6:
+            self.scroll_area = (p[0] << 8 | p[1], p[2] << 8 | p[3],
+                                p[4] << 8 | p[5])
+        elif command == VSCRSADD and len(p) == 2:
+            self.scroll_start = p[0] << 8 | p[1]
+
+    def _advance(self, n):
+        """Move the RAM pointer n pixels through the window."""
+        x, y = self.pointer
+        c0, c1 = self.columns
+        width = c1 - c0 + 1
+        i = (x - c0) + n
+        y += i // width
+        x = c0 + i % width
+        p0, p1 = self.pages
+        if y > p1:
+            y = p0 + (y - p0) % (p1 - p0 + 1)
+        self.pointer = [x, y]
+
+    def _pixels(self, data):
+        if self.pending is not None:
+            data = bytes((self.pending,)) + data
+            self.pending = None
+        if len(data) & 1:
+            self.pending = data[-1]
+            data = data[:-1]
+        n = len(data) // 2
+        self.pixels += n
+        c0, c1 = self.columns
+        i = 0
+        while i < n:
+            x, y = self.pointer
+            run = min(c1 - x + 1, n - i)
+            # Copy the part of this row that lies on the panel
+            if 0 <= y < self.height:
+                a = max(x, 0)
+                b = min(x + run, self.width)
+                if a < b:
+                    o = (y * self.width + a) * 2
+                    s = (i + a - x) * 2
+                    self.fb[o:o + (b - a) * 2] = data[s:s + (b - a) * 2]
+            self._advance(run)
+            i += run
+
+    def _read_pixel(self):
+        """Next byte of an 18-bit RAM read (3 bytes per pixel)."""
+        if self.command != READ_RAM or self.pointer is None:
+            return 0
+        x, y = self.pointer
+        c = self.pixel(x, y)
+        self._advance(1)
+        self.reads = [((c >> 5) & 0x3F) << 2, (c & 0x1F) << 3]
+        return (c >> 11) << 3
+
+    def pixel(self, x, y):
+        """Return the RGB565 value stored at x, y."""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return 0
+        o = (y * self.width + x) * 2
+        return self.fb[o] << 8 | self.fb[o + 1]
+
+    def estimate_us(self, spi_hz=40000000, transaction_us=1.0):
+        """Estimate bus time of the traffic counted so far.
+
+        Args:
+            spi_hz (int): SPI clock.
+            transaction_us (float): Fixed cost per CS assertion (pin
+                toggling and call overhead).
+        Returns:
+            float: Microseconds.
+        """
+        return (self.bytes * 8 * 1000000.0 / spi_hz +
+                self.transactions * transaction_us)
+
+    def stats(self):
+        """Return the traffic counters as a dict."""
+        return {
+            'transactions': self.transactions,
+            'writes': self.writes,
+            'bytes': self.bytes,
+            'pixels': self.pixels,
+            'commands': sum(self.commands.values()),
+        }
+
+    def save_ppm(self, path):
+        """Write the frame buffer as a PPM image for inspection."""
+        with open(path, 'wb') as f:
+            f.write('P6 {0} {1} 255\n'.format(self.width,
+                                             self.height).encode())
+            out = bytearray()
+            for i in range(0, len(self.fb), 2):
+                c = self.fb[i] << 8 | self.fb[i + 1]
+                out += bytes(((c >> 8) & 0xF8, (c >> 3) & 0xFC,
+                              (c << 3) & 0xF8))
+            f.write(out)
@@ -0,0 +1,224 @@
+"""Convert PNG/BMP images to the R565 run-length format (host CPython).
+
+Usage:
+    python3 img2rle.py input.png output.rle
+
+Display.draw_rle_image() in boot.py draws the result.  All numbers are
+big-endian:
+
+    Offset  Size        Field
+    0       4           Magic b'R565'
+    4       2           Width
+    6       2           Height
+    8       2           Palette size P (0 = pixels stored as RGB565)
+    10      2 * P       Palette, RGB565
+    ...     4 * (H + 1) Row offsets from the start of the row data, the
+                        last entry is the total data length
+    ...                 Row data
+
+Each row is a sequence of packets.  A count byte c with c & 0x80 set is
+followed by one value repeated (c & 0x7F) + 1 times, otherwise c + 1
+values follow.  A value is a palette index (1 byte) or an RGB565 color
+(2 bytes).  Images with up to 256 distinct RGB565 colors get a palette.
+"""
+import struct
+import sys
+import zlib
+
+MAX_PACKET = 128
+
+
+def read_bmp(data):
+    """Decode an uncompressed 24 or 32-bit BMP.
+
+    Args:
+        data (bytes): File contents.
+    Returns:
+        tuple: (width, height, rows of (r, g, b) tuples)
+    """
+    offset, = struct.unpack_from('<I', data, 10)
+    w, h, planes, bpp, compression = struct.unpack_from('<iiHHI', data, 18)
+    if bpp not in (24, 32) or compression not in (0, 3):
+        raise ValueError('Only uncompressed 24/32-bit BMP is supported.')
+    step = bpp // 8
+    stride = (w * step + 3) & ~3
+    rows = []
+    for y in range(abs(h)):
+        # Positive height means rows are stored bottom-up
+        src = abs(h) - 1 - y if h > 0 else y
+        start = offset + src * stride
+        rows.append([(data[start + x * step + 2], data[start + x * step + 1],
+                      data[start + x * step]) for x in range(w)])
+    return w, abs(h), rows
+
+
+def read_png(data):
+    """Decode a non-interlaced 8-bit PNG.
+
+    Args:
+        data (bytes): File contents.
+    Returns:
+        tuple: (width, height, rows of (r, g, b) tuples)
+    """
+    pos = 8
+    idat = b''
+    plte = None
+    while pos < len(data):
+        length, kind = struct.unpack_from('>I4s', data, pos)
+        chunk = data[pos + 8:pos + 8 + length]
+        if kind == b'IHDR':
+            w, h, depth, ctype, _, _, interlace = struct.unpack(
+                '>IIBBBBB', chunk)
+        elif kind == b'PLTE':
+            plte = chunk
+        elif kind == b'IDAT':
+            idat += chunk
+        pos += 12 + length
+    if depth != 8 or interlace:
+        raise ValueError('Only 8-bit non-interlaced PNG is supported.')
+    channels = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}[ctype]
+    raw = zlib.decompress(idat)
+    stride = w * channels
+    prev = bytearray(stride)
+    rows = []
+    pos = 0
+    for y in range(h):
+        kind = raw[pos]
+        line = bytearray(raw[pos + 1:pos + 1 + stride])
+        pos += 1 + stride
+        for i in range(stride):
+            a = line[i - channels] if i >= channels else 0
+            b = prev[i]
+            c = prev[i - channels] if i >= channels else 0
+            if kind == 1:
+                line[i] = (line[i] + a) & 0xFF
+            elif kind == 2:
+                line[i] = (line[i] + b) & 0xFF
+            elif kind == 3:
+                line[i] = (line[i] + ((a + b) >> 1)) & 0xFF
+            elif kind == 4:
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                if pa <= pb and pa <= pc:
+                    pred = a
+                elif pb <= pc:
+                    pred = b
+                else:
+                    pred = c
+                line[i] = (line[i] + pred) & 0xFF
+        prev = line
+        pixels = []
+        for x in range(w):
+            v = line[x * channels:(x + 1) * channels]
+            if ctype == 3:
+                pixels.append(tuple(plte[v[0] * 3:v[0] * 3 + 3]))
+            elif ctype in (0, 4):
+                pixels.append((v[0], v[0], v[0]))
+            else:
+                pixels.append((v[0], v[1], v[2]))
+        rows.append(pixels)
+    return w, h, rows
+
+
+def color565(r, g, b):
+    """Return RGB565 color value."""
+    return (r & 0xf8) << 8 | (g & 0xfc) << 3 | b >> 3
+
+
+def encode_row(values, wide):
+    """Run-length encode one row of palette indexes or colors.
+
+    Args:
+        values (list): Pixel values.
+        wide (bool): Values are 2-byte colors rather than 1-byte indexes.
+    Returns:
+        bytearray: Encoded row.
+    """
+    def value(v):
+        return bytes((v >> 8, v & 0xFF)) if wide else bytes((v,))
+
+    # Short runs only pay off when they are cheaper than literals
+    min_run = 2 if wide else 3
+    out = bytearray()
+    literal = []
+    i = 0
+    n = len(values)
+    while i < n:
+        j = i
+        while j < n and j - i < MAX_PACKET and values[j] == values[i]:
+            j += 1
+        if j - i >= min_run:
+            while literal:
+                chunk = literal[:MAX_PACKET]
+                literal = literal[MAX_PACKET:]
+                out.append(len(chunk) - 1)
+                for v in chunk:
+                    out += value(v)
+            out.append(0x80 | (j - i - 1))
+            out += value(values[i])
+            i = j
+        else:
+            literal.append(values[i])
+            i += 1
+    while literal:
+        chunk = literal[:MAX_PACKET]
+        literal = literal[MAX_PACKET:]
+        out.append(len(chunk) - 1)
+        for v in chunk:
+            out += value(v)
+    return out
+
+
+def convert(w, h, rows):
+    """Build an R565 file from decoded pixels.
+
+    Args:
+        w (int): Width.
+        h (int): Height.
+        rows (list): Rows of (r, g, b) tuples.
+    Returns:
+        bytes: File contents.
+    """
+    rows = [[color565(*p) for p in row] for row in rows]
+    colors = sorted(set(c for row in rows for c in row))
+    if len(colors) <= 256:
+        index = dict((c, i) for i, c in enumerate(colors))
+        rows = [[index[c] for c in row] for row in rows]
+        palette = b''.join(struct.pack('>H', c) for c in colors)
+    else:
+        colors = []
+        palette = b''
+    data = bytearray()
+    offsets = []
+    for row in rows:
+        offsets.append(len(data))
+        data += encode_row(row, not colors)
+    offsets.append(len(data))
+    head = b'R565' + struct.pack('>HHH', w, h, len(colors))
+    table = b''.join(struct.pack('>I', o) for o in offsets)
+    return head + palette + table + bytes(data)
+
+
+def main(argv):
+    if len(argv) != 3:
+        print(__doc__)
+        return 2
+    with open(argv[1], 'rb') as f:
+        data = f.read()
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        w, h, rows = read_png(data)
+    elif data[:2] == b'BM':
+        w, h, rows = read_bmp(data)
+    else:
+        raise ValueError('Input must be a PNG or BMP image.')
+    out = convert(w, h, rows)
+    with open(argv[2], 'wb') as f:
+        f.write(out)
+    raw = w * h * 2
+    print('{0}x{1}: {2} bytes raw, {3} bytes R565 ({4:.1f}x)'.format(
+        w, h, raw, len(out), raw / len(out)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))